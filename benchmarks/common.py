@@ -0,0 +1,25 @@
+"""Synthetic daily series shared by the benchmarks."""
+
+import numpy as np
+
+YEARS = [1, 10, 50]
+DENSITIES = ["dense", "sparse"]
+
+# Fraction of days with a value in a sparse series.
+SPARSE_FRACTION = 0.1
+
+
+def make_series(years: int, density: str, seed: int = 0):
+    """Daily dates and values over `years` years, starting 2000-01-01.
+
+    Dense series have a value for every day. Sparse series have values for a
+    random tenth of the days, in random order, with gaps for july to fill in.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2000-01-01")
+    dates = start + np.arange(int(years * 365.25))
+    if density == "sparse":
+        n_days = int(len(dates) * SPARSE_FRACTION)
+        dates = rng.choice(dates, n_days, replace=False)
+    data = rng.integers(0, 100, len(dates)).astype(float)
+    return dates, data
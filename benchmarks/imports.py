@@ -0,0 +1,55 @@
+"""Import time benchmarks.
+
+Run with asv (`asv run`), or directly with `python benchmarks/imports.py` for a
+quick comparison in the current environment (with july installed or on the
+PYTHONPATH).
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+class ImportSuite:
+    """Time imports in a fresh interpreter. `import july` should not pay for
+    matplotlib, which the `matplotlib.pyplot` benchmark shows the cost of.
+    """
+
+    def timeraw_import_july(self):
+        return "import july"
+
+    def timeraw_import_july_utils(self):
+        return "import july.utils"
+
+    def timeraw_import_july_plot(self):
+        return "import july.plot"
+
+    def timeraw_first_colormap_lookup(self):
+        return (
+            "from july.colormaps import cmaps_dict; cmaps_dict['july']",
+            "import july",
+        )
+
+    def timeraw_import_pyplot(self):
+        return "import matplotlib.pyplot"
+
+
+def _time_import(stmt: str, setup: str = "", repeat: int = 5) -> float:
+    code = (
+        "import timeit; " f"print(timeit.timeit({stmt!r}, setup={setup!r}, number=1))"
+    )
+    times = [
+        float(subprocess.check_output([sys.executable, "-c", code]))
+        for _ in range(repeat)
+    ]
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    suite = ImportSuite()
+    for name in sorted(dir(suite)):
+        if name.startswith("timeraw_"):
+            stmt = getattr(suite, name)()
+            stmt, setup = stmt if isinstance(stmt, tuple) else (stmt, "")
+            label = name[len("timeraw_") :]
+            print(f"{label:<25} {_time_import(stmt, setup) * 1000:8.1f} ms")
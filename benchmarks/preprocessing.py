@@ -0,0 +1,41 @@
+"""Benchmarks of input preprocessing and grid building, without matplotlib."""
+
+import datetime
+from july.utils import date_grid, preprocess_inputs, preprocess_month, quantize
+
+from .common import DENSITIES, YEARS, make_series
+
+
+class Preprocess:
+    params = [YEARS, DENSITIES]
+    param_names = ["years", "density"]
+
+    def setup(self, years, density):
+        self.dates, self.data = make_series(years, density)
+        self.date_list = self.dates.astype(datetime.date).tolist()
+        self.dates_clean, self.data_clean = preprocess_inputs(self.dates, self.data)
+
+    def time_preprocess_inputs(self, years, density):
+        preprocess_inputs(self.dates, self.data)
+
+    def time_preprocess_inputs_date_list(self, years, density):
+        preprocess_inputs(self.date_list, self.data)
+
+    def peakmem_preprocess_inputs(self, years, density):
+        preprocess_inputs(self.dates, self.data)
+
+    def time_preprocess_month(self, years, density):
+        preprocess_month(self.dates, self.data, month=6, year=2000)
+
+    def time_date_grid(self, years, density):
+        date_grid(self.dates_clean, self.data_clean, horizontal=True)
+
+    def peakmem_date_grid(self, years, density):
+        date_grid(self.dates_clean, self.data_clean, horizontal=True)
+
+    def peakmem_date_grid_float32(self, years, density):
+        date_grid(self.dates_clean, self.data_clean, horizontal=True, dtype="float32")
+
+    def peakmem_date_grid_uint8(self, years, density):
+        values = quantize(self.data_clean, 0, 100)
+        date_grid(self.dates_clean, values, horizontal=True, dtype="uint8")
@@ -0,0 +1,268 @@
+"""Benchmarks of drawing and encoding heatmaps with matplotlib."""
+
+import io
+import resource
+import sys
+import matplotlib
+import numpy as np
+
+# Benchmarks never show figures.
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import july  # noqa: E402
+from july.helpers import cal_heatmap  # noqa: E402
+from july.utils import date_grid, preprocess_inputs  # noqa: E402
+
+from .common import DENSITIES, YEARS, make_series  # noqa: E402
+
+# Options of `cal_heatmap` that add artists, timed one at a time. 'none' turns
+# all of them off.
+CAL_HEATMAP_OPTIONS = [
+    "none",
+    "value_label",
+    "date_label",
+    "weekday_label",
+    "month_label",
+    "year_label",
+    "month_grid",
+    "colorbar",
+]
+
+
+class CalHeatmap:
+    params = [YEARS, CAL_HEATMAP_OPTIONS]
+    param_names = ["years", "option"]
+
+    def setup(self, years, option):
+        dates, data = make_series(years, "dense")
+        self.dates, data_clean = preprocess_inputs(dates, data)
+        self.cal = date_grid(self.dates, data_clean, horizontal=True)
+        self.kwargs = {
+            "weekday_label": False,
+            "month_label": False,
+            "year_label": False,
+        }
+        if option != "none":
+            self.kwargs[option] = True
+
+    def teardown(self, years, option):
+        plt.close("all")
+
+    def time_cal_heatmap(self, years, option):
+        cal_heatmap(self.cal, self.dates, horizontal=True, **self.kwargs)
+
+    def time_cal_heatmap_draw(self, years, option):
+        ax = cal_heatmap(self.cal, self.dates, horizontal=True, **self.kwargs)
+        ax.get_figure().canvas.draw()
+
+
+class Plots:
+    params = [YEARS, DENSITIES]
+    param_names = ["years", "density"]
+
+    def setup(self, years, density):
+        self.dates, self.data = make_series(years, density)
+
+    def teardown(self, years, density):
+        plt.close("all")
+
+    def time_heatmap(self, years, density):
+        july.heatmap(self.dates, self.data)
+
+    def peakmem_heatmap(self, years, density):
+        july.heatmap(self.dates, self.data)
+
+    def time_month_plot(self, years, density):
+        july.month_plot(self.dates, self.data, month=6, year=2000)
+
+
+class CalendarPlot:
+    # One subplot per month, so 50 years is left out.
+    params = [[1, 10], DENSITIES]
+    param_names = ["years", "density"]
+    timeout = 300
+
+    def setup(self, years, density):
+        self.dates, self.data = make_series(years, density)
+
+    def teardown(self, years, density):
+        plt.close("all")
+
+    def time_calendar_plot(self, years, density):
+        july.calendar_plot(self.dates, self.data)
+
+    def peakmem_calendar_plot(self, years, density):
+        july.calendar_plot(self.dates, self.data)
+
+
+class Savefig:
+    params = [YEARS, ["png", "svg"], ["mesh", "image"]]
+    param_names = ["years", "format", "render"]
+
+    def setup(self, years, format, render):
+        dates, data = make_series(years, "dense")
+        ax = july.heatmap(dates, data, month_grid=True, render=render)
+        self.fig = ax.get_figure()
+
+    def teardown(self, years, format, render):
+        plt.close("all")
+
+    def time_savefig(self, years, format, render):
+        self.fig.savefig(io.BytesIO(), format=format)
+
+    def peakmem_savefig(self, years, format, render):
+        self.fig.savefig(io.BytesIO(), format=format)
+
+    def track_savefig_bytes(self, years, format, render):
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format=format)
+        return len(buf.getvalue())
+
+    track_savefig_bytes.unit = "bytes"  # type: ignore
+
+
+class HeatmapSVG:
+    params = [YEARS, DENSITIES]
+    param_names = ["years", "density"]
+
+    def setup(self, years, density):
+        self.dates, self.data = make_series(years, density)
+
+    def time_heatmap_svg(self, years, density):
+        july.heatmap_svg(self.dates, self.data, month_grid=True, colorbar=True)
+
+
+class HeatmapGrid:
+    params = [[10, 50]]
+    param_names = ["n_series"]
+
+    def setup(self, n_series):
+        self.dates, data = make_series(1, "dense")
+        self.data = np.tile(data, (n_series, 1))
+
+    def teardown(self, n_series):
+        plt.close("all")
+
+    def time_heatmap_grid(self, n_series):
+        july.heatmap_grid(self.dates, self.data, colorbar=True)
+
+    def time_heatmap_loop(self, n_series):
+        for row in self.data:
+            july.heatmap(self.dates, row)
+
+
+class Animate:
+    params = [YEARS]
+    param_names = ["years"]
+
+    def setup(self, years):
+        dates, data = make_series(years, "dense")
+        self.hm = july.HeatmapFigure(dates, data)
+        self.hm.show_window(0, 30)
+        self.hm.fig.canvas.draw()
+
+    def teardown(self, years):
+        plt.close("all")
+
+    def time_show_window(self, years):
+        self.hm.show_window(1, 30)
+        self.hm.show_window(0, 30)
+
+
+class Extend:
+    params = [YEARS]
+    param_names = ["years"]
+
+    def setup(self, years):
+        dates, data = make_series(years, "dense")
+        self.hm = july.HeatmapFigure(dates, data, month_grid=True, colorbar=True)
+        # The first append makes room for more weeks.
+        self.last = dates[-1] + 1
+        self.hm.append(self.last, 1.0)
+
+    def teardown(self, years):
+        plt.close("all")
+
+    def time_append_day(self, years):
+        self.last += 1
+        self.hm.append(self.last, 1.0)
+
+
+class ExtendNew:
+    # A new daily dashboard: appends while all dates are in the first month.
+    def setup(self):
+        dates = np.array(["2021-03-01", "2021-03-02"], dtype="datetime64[D]")
+        self.hm = july.HeatmapFigure(dates, [1.0, 2.0], month_grid=True)
+        self.last = dates[-1]
+
+    def teardown(self):
+        plt.close("all")
+
+    def time_append_day(self):
+        self.last += 1
+        self.hm.append(self.last, 1.0)
+
+    def time_extend_empty(self):
+        # A refresh without new dates, e.g. only NaT rows, changes nothing.
+        self.hm.extend(np.array(["NaT"], dtype="datetime64[D]"), [1.0])
+        self.hm.extend([])
+
+
+# Soak tests: plot kind, years of data, number of renders and the most the peak
+# RSS may grow over them, in KiB. A figure that is not freed holds several MiB, so
+# a leak exceeds the bound quickly. Calendars and long heatmaps take long enough to
+# build that parts of their figures reach the oldest garbage collector generation.
+SOAK_CASES = {
+    "heatmap": ("heatmap", 1, 2000, 32 * 1024),
+    "heatmap_6y": ("heatmap", 6, 150, 8 * 1024),
+    "calendar": ("calendar", 1, 60, 8 * 1024),
+}
+
+
+def peak_rss_kib() -> int:
+    # ru_maxrss is in bytes on macOS, and in KiB on Linux.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class RenderToBytes:
+    params = [["png", "svg"]]
+    param_names = ["format"]
+
+    def setup(self, format):
+        self.dates, self.data = make_series(1, "dense")
+
+    def time_render_to_bytes(self, format):
+        july.render_to_bytes(format=format, dates=self.dates, data=self.data)
+
+
+class RenderSoak:
+    params = [["png", "svg"], [*SOAK_CASES]]
+    param_names = ["format", "case"]
+    timeout = 900
+
+    def setup(self, format, case):
+        kind, years, _, _ = SOAK_CASES[case]
+        dates, data = make_series(years, "dense")
+        self.kwargs = {"kind": kind, "format": format, "dates": dates, "data": data}
+
+    def track_soak_rss_growth(self, format, case):
+        # Growth of the peak RSS over many renders, after warming up the caches.
+        # Figures that are not freed show up as steady growth.
+        _, _, renders, max_growth = SOAK_CASES[case]
+        for _ in range(5):
+            july.render_to_bytes(**self.kwargs)
+        start = peak_rss_kib()
+        for _ in range(renders):
+            july.render_to_bytes(**self.kwargs)
+        growth = peak_rss_kib() - start
+        # Fail the benchmark, rather than only chart the growth, if memory is not
+        # flat.
+        assert growth < max_growth, (
+            f"Peak RSS grew by {growth} KiB over {renders} renders. "
+            f"Expected less than {max_growth} KiB."
+        )
+        return growth
+
+    track_soak_rss_growth.unit = "KiB"  # type: ignore
@@ -2,6 +2,57 @@ __version__ = "0.1.3"
 __author__ = "Edvard Hultén"
 __contact__ = "edvard.hulten@gmail.com"
 
-from july.plot import heatmap, month_plot, calendar_plot
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["heatmap", "month_plot", "calendar_plot"]
+if TYPE_CHECKING:
+    from july.plot import (  # noqa: F401
+        heatmap,
+        month_plot,
+        calendar_plot,
+        heatmap_grid,
+        heatmap_from_events,
+        hour_heatmap,
+    )
+    from july.figure import HeatmapFigure, animate  # noqa: F401
+    from july.render import (  # noqa: F401
+        render_many,
+        iter_render_many,
+        render_to_bytes,
+        render_async,
+    )
+    from july.io import load_daily  # noqa: F401
+    from july.svg import heatmap_svg  # noqa: F401
+    from july.profiling import profile  # noqa: F401
+
+# Public names and the modules they live in. The modules (and with them
+# matplotlib) are imported on first access, to keep `import july` fast.
+_lazy_imports = {
+    "heatmap": "july.plot",
+    "month_plot": "july.plot",
+    "calendar_plot": "july.plot",
+    "heatmap_grid": "july.plot",
+    "heatmap_from_events": "july.plot",
+    "hour_heatmap": "july.plot",
+    "HeatmapFigure": "july.figure",
+    "animate": "july.figure",
+    "render_many": "july.render",
+    "iter_render_many": "july.render",
+    "render_to_bytes": "july.render",
+    "render_async": "july.render",
+    "load_daily": "july.io",
+    "heatmap_svg": "july.svg",
+    "profile": "july.profiling",
+}
+
+__all__ = [*_lazy_imports.keys()]
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        return getattr(importlib.import_module(_lazy_imports[name]), name)
+    raise AttributeError(f"module 'july' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted([*globals().keys(), *__all__])
@@ -1,5 +1,6 @@
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap, LinearSegmentedColormap
+import numpy as np
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Tuple, Union
 
 
 def tups2cmap(tups_list, reverse=False):
@@ -8,9 +9,6 @@ def tups2cmap(tups_list, reverse=False):
     return cmap if not reverse else cmap[::-1]
 
 
-cmaps_list = plt.colormaps()
-cmaps_dict = dict(zip(cmaps_list, cmaps_list))
-
 july_lst = [
     (204, 71, 71, 255),
     (230, 97, 97, 255),
@@ -25,8 +23,6 @@ july_lst = [
     (255, 255, 212, 255),
     (255, 255, 237, 255),
 ]
-cmaps_dict["july_r"] = LinearSegmentedColormap.from_list("", tups2cmap(july_lst))
-cmaps_dict["july"] = LinearSegmentedColormap.from_list("", tups2cmap(july_lst, True))
 
 github_list = [
     (235, 237, 240, 255),
@@ -35,8 +31,6 @@ github_list = [
     (48, 161, 78, 255),
     (33, 110, 57, 255),
 ]
-cmaps_dict["github"] = ListedColormap(tups2cmap(github_list))
-cmaps_dict["github_r"] = ListedColormap(tups2cmap(github_list, True))
 
 sunset_list = [
     (255, 229, 119, 255),
@@ -45,10 +39,6 @@ sunset_list = [
     (253, 96, 81, 255),
     (57, 32, 51, 255),
 ]
-cmaps_dict["sunset"] = LinearSegmentedColormap.from_list("", tups2cmap(sunset_list))
-cmaps_dict["sunset_r"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(sunset_list, True)
-)
 
 dark_golden_list = [
     (254, 192, 54, 255),
@@ -57,12 +47,6 @@ dark_golden_list = [
     (111, 1, 0, 255),
     (36, 0, 2, 255),
 ]
-cmaps_dict["dark_golden"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(dark_golden_list)
-)
-cmaps_dict["dark_golden_r"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(dark_golden_list, True)
-)
 
 golden_hour_list = [
     (254, 253, 242, 255),
@@ -76,12 +60,6 @@ golden_hour_list = [
     (189, 110, 71, 255),
     (166, 92, 65, 255),
 ]
-cmaps_dict["golden_hour"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(golden_hour_list)
-)
-cmaps_dict["golden_hour_r"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(golden_hour_list, True)
-)
 
 golden_list = [
     (255, 254, 253, 255),
@@ -96,10 +74,6 @@ golden_list = [
     (144, 78, 62, 255),
     (129, 76, 61, 255),
 ]
-cmaps_dict["golden"] = LinearSegmentedColormap.from_list("", tups2cmap(golden_list))
-cmaps_dict["golden_r"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(golden_list, True)
-)
 
 pastel_sunrise_list = [
     (188, 133, 163, 255),
@@ -109,9 +83,112 @@ pastel_sunrise_list = [
     (72, 123, 166, 255),
 ]
 
-cmaps_dict["pastel_sunrise"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(pastel_sunrise_list)
-)
-cmaps_dict["pastel_sunrise_r"] = LinearSegmentedColormap.from_list(
-    "", tups2cmap(pastel_sunrise_list, True)
-)
+# Colormaps defined by july: name -> (colors, whether to reverse the colors,
+# whether to interpolate between the colors (as opposed to using them as is)).
+july_cmaps: Dict[str, Tuple[list, bool, bool]] = {
+    "july_r": (july_lst, False, True),
+    "july": (july_lst, True, True),
+    "github": (github_list, False, False),
+    "github_r": (github_list, True, False),
+    "sunset": (sunset_list, False, True),
+    "sunset_r": (sunset_list, True, True),
+    "dark_golden": (dark_golden_list, False, True),
+    "dark_golden_r": (dark_golden_list, True, True),
+    "golden_hour": (golden_hour_list, False, True),
+    "golden_hour_r": (golden_hour_list, True, True),
+    "golden": (golden_list, False, True),
+    "golden_r": (golden_list, True, True),
+    "pastel_sunrise": (pastel_sunrise_list, False, True),
+    "pastel_sunrise_r": (pastel_sunrise_list, True, True),
+}
+
+
+class ColormapRegistry(MutableMapping):
+    """Dictionary of colormaps by name, with july's own colormaps and all the
+    matplotlib colormaps. Colormaps are only created (and matplotlib imported) on
+    first lookup.
+    """
+
+    def __init__(self) -> None:
+        self._cmaps: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._cmaps:
+            self._cmaps[name] = self._create(name)
+        return self._cmaps[name]
+
+    def __setitem__(self, name: str, cmap: Any) -> None:
+        self._cmaps[name] = cmap
+
+    def __delitem__(self, name: str) -> None:
+        del self._cmaps[name]
+
+    def __iter__(self) -> Iterator[str]:
+        import matplotlib
+
+        if hasattr(matplotlib, "colormaps"):
+            mpl_names = list(matplotlib.colormaps)
+        else:
+            from matplotlib import pyplot as plt
+
+            mpl_names = plt.colormaps()
+        names = [*mpl_names, *july_cmaps, *self._cmaps]
+        return iter(dict.fromkeys(names))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, name: object) -> bool:
+        try:
+            self[name]  # type: ignore
+        except KeyError:
+            return False
+        return True
+
+    @staticmethod
+    def _create(name: str) -> Any:
+        import matplotlib
+        from matplotlib.colors import ListedColormap, LinearSegmentedColormap
+
+        if name in july_cmaps:
+            colors, reverse, interpolate = july_cmaps[name]
+            if interpolate:
+                return LinearSegmentedColormap.from_list("", tups2cmap(colors, reverse))
+            return ListedColormap(tups2cmap(colors, reverse))
+        if hasattr(matplotlib, "colormaps"):
+            return matplotlib.colormaps[name]
+        # Matplotlib < 3.5.
+        from matplotlib import cm
+
+        try:
+            return cm.get_cmap(name)
+        except ValueError:
+            raise KeyError(name) from None
+
+
+cmaps_dict = ColormapRegistry()
+
+
+def colormap_lut(cmap: Union[str, Any]) -> np.ndarray:
+    """Get the lookup table of a colormap, as an (N, 4) array of RGBA in [0, 1].
+
+    Value x in [0, 1] has color lut[min(int(x * N), N - 1)], as in matplotlib.
+    July's own colormaps are built with NumPy alone, without importing matplotlib.
+
+    Args:
+        cmap: Name of a colormap in `cmaps_dict`, or a matplotlib Colormap.
+    Returns:
+        Lookup table of the colormap.
+    """
+    if isinstance(cmap, str) and cmap in july_cmaps:
+        colors, reverse, interpolate = july_cmaps[cmap]
+        rgba = np.array(tups2cmap(colors, reverse))
+        if not interpolate:
+            return rgba
+        # Same as LinearSegmentedColormap.from_list with N=256.
+        stops = np.linspace(0, 1, len(rgba))
+        x = np.linspace(0, 1, 256)
+        return np.column_stack([np.interp(x, stops, channel) for channel in rgba.T])
+    if isinstance(cmap, str):
+        cmap = cmaps_dict[cmap]
+    return cmap(np.arange(cmap.N))
@@ -0,0 +1,609 @@
+import datetime
+import io
+import numpy as np
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
+from matplotlib.animation import FuncAnimation
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LinearSegmentedColormap, ListedColormap
+from july.helpers import (
+    add_year_annotation,
+    draw_calendar,
+    draw_cells,
+    draw_month_outline,
+    move_month_label,
+)
+from july.utils import (
+    date_parts,
+    fill_masked,
+    format_cells,
+    get_month_outline,
+    period_locs,
+    preprocess_inputs,
+    split_series,
+    to_datetime64,
+    to_values,
+    value_label_format,
+)
+from july.rcmod import rc_context
+
+
+class HeatmapFigure:
+    """Heatmap whose layout is built once and whose values can be updated in place.
+
+    The figure, axes, cells, ticks, month and year labels, outlines and colorbar
+    are created on construction. `update` only pushes new values into the cells
+    (and value labels) and adjusts the color limits. `append` and `extend` add
+    dates after the last one, changing only what the new dates touch.
+
+    Args:
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date. Defines the date range of the heatmap.
+        data: List like data structure with numeric data. Defaults to the values of
+            a Series `dates`, else zeros.
+        horizontal: Whether to plot heatmap horizontally. Grid shape (7, n_weeks)
+            if True, (n_weeks, 7) if False.
+        cmap: Colormap. Any matplotlib colormap works.
+        value_label: Whether to add value label inside grid.
+        date_label: Whether to add date label inside grid.
+        weekday_label: Whether to label the short axis with weekday abbreviations.
+        month_label: Whether to add month label(s) along the long axis.
+        year_label: Whether to add year label(s) along the long axis.
+        month_grid: Whether to outline each month in the grid.
+        month_grid_color: Color to use for month grid outline.
+        colorbar: Whether to add colorbar.
+        frame_on: Whether to turn frame on.
+        value_format: Format of value_label: 'int' or 'decimal'. Only relevant if
+            `value_label` is True.
+        title: Title of the plot.
+        cmin: Minimum value of the colorbar. Defaults to minimum value of `data`.
+        cmax: Maximum value of the colorbar. Defaults to maximum value of 'data'.
+        cbar_label_format: Format string for colorbar labels.
+        ax: Matplotlib Axes object.
+        render: How to draw the cells: 'mesh' or 'image'. See `heatmap`.
+        fill_missing: Value of the days without data within the date range, in
+            the constructor, `update` and `extend`. None leaves them empty.
+        kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
+            keyword arguments as defined in `update_rcparams` or a dict with any
+            rcParam as key(s).
+    """
+
+    def __init__(
+        self,
+        dates: List[Union[str, datetime.date, datetime.datetime]],
+        data: Optional[List[float]] = None,
+        horizontal: bool = True,
+        cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
+        value_label: bool = False,
+        date_label: bool = False,
+        weekday_label: bool = True,
+        month_label: bool = True,
+        year_label: bool = True,
+        month_grid: bool = False,
+        month_grid_color: str = "black",
+        colorbar: bool = False,
+        frame_on: bool = False,
+        value_format: str = "int",
+        title: Optional[str] = None,
+        cmin: Optional[int] = None,
+        cmax: Optional[int] = None,
+        cbar_label_format: Optional[str] = None,
+        ax: Optional[Axes] = None,
+        render: str = "mesh",
+        fill_missing: Optional[float] = 0,
+        **kwargs,
+    ):
+        with rc_context(**kwargs):
+            dates, data = split_series(dates, data)
+            self._input_dates = to_datetime64(dates)
+            self.dates, data_clean = preprocess_inputs(
+                self._input_dates,
+                np.zeros(len(self._input_dates)) if data is None else data,
+            )
+            self.horizontal = horizontal
+            self.fill_missing = fill_missing
+            self.cmin = cmin
+            self.cmax = cmax
+            self._value_format = (
+                value_label_format(value_format) if value_label else None
+            )
+            self._date_label = date_label
+            self._month_label = month_label
+            self._render = render
+            self._month_grid_color = month_grid_color
+            self._style = kwargs
+
+            # Weekday of the first date and number of weeks the grid has room for,
+            # from which the flat position in the grid of each date follows, so
+            # updates skip the date arithmetic.
+            self._first_day = int((self.dates[0].astype(np.int64) + 3) % 7)
+            self._grid_weeks = self._n_weeks(len(self.dates))
+            self._day_cells = self._cell_positions(np.arange(len(self.dates)))
+            # Values of all dates, and the range of dates shown by `show_window`.
+            self.values = fill_masked(data_clean, fill_missing)
+            self._window: Optional[Tuple[int, int]] = None
+            self._cal = self._to_grid(self.values)
+
+            artists = draw_calendar(
+                cal=self._cal,
+                dates=self.dates,
+                horizontal=horizontal,
+                cmap=cmap,
+                value_label=value_label,
+                date_label=date_label,
+                weekday_label=weekday_label,
+                month_label=month_label,
+                year_label=year_label,
+                month_grid=month_grid,
+                month_grid_color=month_grid_color,
+                colorbar=colorbar,
+                frame_on=frame_on,
+                value_format=value_format,
+                title=title,
+                cmin=cmin,
+                cmax=cmax,
+                cbar_label_format=cbar_label_format,
+                ax=ax,
+                render=render,
+            )
+            self.ax = artists.ax
+            self.fig = self.ax.get_figure()
+            self.cells = artists.cells
+            self.labels = artists.labels
+            self.colorbar = artists.colorbar
+            self.outline = artists.outline
+            self.year_labels = artists.year_labels
+
+            # State of `extend`: buffers with room for more dates, months and years
+            # with their label locations, and the outline of the last month, which
+            # starts at date `_outline_begin`. `outline` then holds the others.
+            self._buffers: Dict[str, np.ndarray] = {}
+            self._periods: Dict[str, Tuple[List[int], List[float]]] = {}
+            self._outline_tail: Optional[LineCollection] = None
+            self._outline_begin = 0
+
+    def update(
+        self,
+        data: List[Any],
+        dates: Optional[List[Union[str, datetime.date, datetime.datetime]]] = None,
+        cmin: Optional[float] = None,
+        cmax: Optional[float] = None,
+    ) -> "HeatmapFigure":
+        """Replace the values shown in the heatmap.
+
+        Args:
+            data: List like data structure with numeric data.
+            dates: Dates of `data`, within the date range of the heatmap. Defaults
+                to the dates the heatmap was created with, followed by those added
+                with `extend`.
+            cmin: Minimum value of the colorbar. Defaults to the `cmin` the heatmap
+                was created with, or else the minimum value of `data`.
+            cmax: Maximum value of the colorbar. Defaults to the `cmax` the heatmap
+                was created with, or else the maximum value of `data`.
+        Returns:
+            The updated HeatmapFigure.
+
+        Raises:
+            ValueError: If `dates` are outside the date range of the heatmap.
+        """
+        dates_arr = self._input_dates if dates is None else to_datetime64(dates)
+        dates_clean, data_clean = preprocess_inputs(dates_arr, data)
+        offset = (dates_clean[0] - self.dates[0]).astype(int)
+        if offset < 0 or offset + len(dates_clean) > len(self.dates):
+            raise ValueError(
+                f"Dates {dates_clean[0]} to {dates_clean[-1]} are outside the date "
+                f"range of the heatmap: {self.dates[0]} to {self.dates[-1]}."
+            )
+        values = np.ma.masked_all(len(self.dates), dtype=data_clean.dtype)
+        values[offset : offset + len(data_clean)] = data_clean
+
+        self.values = fill_masked(values, self.fill_missing)
+        self._window = None
+        cal = self._cal = self._to_grid(self.values)
+        self.cells.set_array(cal)
+        self.cells.set_clim(
+            cmin or self.cmin or np.nanmin(cal), cmax or self.cmax or np.nanmax(cal)
+        )
+        if self._value_format is not None and self.labels is not None:
+            self.labels.set_labels(format_cells(cal, self._value_format))
+        return self
+
+    def show_window(self, start: int, window: int) -> "HeatmapFigure":
+        """Show only the values of the `window` dates from index `start` in `dates`.
+
+        Other dates are shown as empty cells. After the first call, only the cells
+        that enter or leave the window are changed. The color limits are kept, so
+        colors are comparable between windows. `update` shows all dates again.
+
+        Args:
+            start: Index of the first date in the window.
+            window: Number of dates in the window.
+        Returns:
+            The updated HeatmapFigure.
+        """
+        end = min(start + window, len(self.dates))
+        cal = self._cal.reshape(-1)
+        if self._window is None:
+            cal[self._day_cells] = np.nan
+            changed = np.arange(start, end)
+            cal[self._day_cells[changed]] = self.values[changed]
+        else:
+            old_start, old_end = self._window
+            leaving = np.r_[
+                old_start : min(old_end, start), max(end, old_start) : old_end
+            ]
+            entering = np.r_[start : min(end, old_start), max(start, old_end) : end]
+            cal[self._day_cells[leaving]] = np.nan
+            cal[self._day_cells[entering]] = self.values[entering]
+        self._window = (start, end)
+
+        self.cells.set_array(self._cal)
+        if self._value_format is not None and self.labels is not None:
+            self.labels.set_labels(format_cells(self._cal, self._value_format))
+        return self
+
+    def animate(
+        self, window: int, step: int = 1, interval: float = 100, blit: bool = True
+    ) -> FuncAnimation:
+        """Animate a window of dates sliding over the heatmap. See `show_window`.
+
+        Only the cells are redrawn in each frame when `blit` is True. Save the
+        animation with e.g. `anim.save("heatmap.mp4", writer="ffmpeg")` or
+        `anim.save("heatmap.gif", writer="pillow")`.
+
+        Args:
+            window: Number of dates in the window.
+            step: Number of dates the window moves by in each frame.
+            interval: Delay between frames in milliseconds.
+            blit: Whether to redraw only the cells (and value labels) in each frame.
+        Returns:
+            Matplotlib FuncAnimation. Keep a reference to it while it runs.
+        """
+        artists: List[Artist] = [self.cells]
+        if self._value_format is not None and self.labels is not None:
+            artists.append(self.labels)
+
+        def draw_frame(start: int) -> List[Artist]:
+            self.show_window(start, window)
+            return artists
+
+        starts = self._window_starts(window, step)
+        return FuncAnimation(
+            self.fig,
+            draw_frame,
+            frames=starts,
+            init_func=lambda: draw_frame(starts[0]),
+            interval=interval,
+            blit=blit,
+        )
+
+    def iter_frames(
+        self,
+        window: int,
+        step: int = 1,
+        format: str = "png",
+        dpi: Optional[float] = None,
+    ) -> Iterator[bytes]:
+        """Render the frames of `animate` one by one, e.g. to write a PNG sequence or
+        to pipe them to an encoder.
+
+        Args:
+            window: Number of dates in the window.
+            step: Number of dates the window moves by in each frame.
+            format: Image format passed to `savefig`.
+            dpi: Resolution passed to `savefig`. Defaults to the figure dpi.
+        Returns:
+            Iterator of encoded images, one per frame.
+        """
+        buf = io.BytesIO()
+        for start in self._window_starts(window, step):
+            self.show_window(start, window)
+            buf.seek(0)
+            buf.truncate()
+            self.fig.savefig(buf, format=format, dpi=dpi)
+            yield buf.getvalue()
+
+    def _window_starts(self, window: int, step: int) -> List[int]:
+        if window < 1 or step < 1:
+            raise ValueError(
+                "Arguments 'window' and 'step' must be positive. "
+                f"Got: {window} and {step}."
+            )
+        # The last window ends at the last date, also if `step` does not divide the
+        # number of dates.
+        last = max(len(self.dates) - window, 0)
+        starts = list(range(0, last + 1, step))
+        if starts[-1] != last:
+            starts.append(last)
+        return starts
+
+    def append(
+        self, date: Union[str, datetime.date, datetime.datetime], value: float
+    ) -> "HeatmapFigure":
+        """Add the value of one date after the last date of the heatmap.
+
+        See `extend`.
+
+        Args:
+            date: Date after the last date of the heatmap.
+            value: Value of `date`.
+        Returns:
+            The updated HeatmapFigure.
+        """
+        return self.extend([date], [value])
+
+    def extend(
+        self,
+        dates: List[Union[str, datetime.date, datetime.datetime]],
+        data: Optional[List[float]] = None,
+    ) -> "HeatmapFigure":
+        """Add the values of dates after the last date of the heatmap.
+
+        Only the new cells (and their labels), the month and year labels of the
+        months and years the new dates fall in, and the outline of the last month
+        change. Weeks are added within spare grid columns, which are added a
+        quarter of the grid at a time, and the outline of the other months is only
+        set when a month is completed, so a daily refresh costs about the same
+        whatever the number of dates already shown. Days between the last date of
+        the heatmap and `dates` get `fill_missing`. Dates that are NaT or masked
+        are skipped, and extending with no dates changes nothing.
+
+        Args:
+            dates: List like data structure with dates, or a pandas Series indexed
+                by date.
+            data: List like data structure with numeric data. Defaults to the
+                values of a Series `dates`, else zeros.
+        Returns:
+            The updated HeatmapFigure.
+
+        Raises:
+            ValueError: If `dates` are not after the last date of the heatmap.
+        """
+        dates, data = split_series(dates, data)
+        input_dates = to_datetime64(dates)
+        input_data = np.zeros(len(input_dates)) if data is None else to_values(data)
+        # Rows without a date (NaT or masked) add nothing.
+        missing = np.isnat(input_dates)
+        if np.ma.isMaskedArray(dates):
+            missing |= np.ma.getmaskarray(dates)
+        if missing.any() and len(input_data) == len(input_dates):
+            input_dates, input_data = input_dates[~missing], input_data[~missing]
+        if len(input_dates) == 0:
+            return self
+
+        dates_clean, data_clean = preprocess_inputs(input_dates, input_data)
+        gap = int((dates_clean[0] - self.dates[-1]).astype(int)) - 1
+        if gap < 0:
+            raise ValueError(
+                f"Dates must be after the last date of the heatmap, {self.dates[-1]}. "
+                f"Got: {dates_clean[0]}. Use `update` to change existing dates."
+            )
+        values = np.ma.masked_all(gap + len(dates_clean))
+        values[gap:] = data_clean
+        values = fill_masked(values, self.fill_missing)
+
+        with rc_context(**self._style):
+            n = len(self.dates)
+            new = np.arange(n, n + len(values))
+            old_weeks = self._n_weeks(n)
+            self._append("_input_dates", input_dates)
+            self._append("dates", self.dates[-1] + (new - n + 1))
+            self._append("values", values)
+            if self._n_weeks(len(self.dates)) > self._grid_weeks:
+                self._grow(self._n_weeks(len(self.dates)))
+            else:
+                self._append("_day_cells", self._cell_positions(new))
+            self._extend_long_axis(self._n_weeks(len(self.dates)) - old_weeks)
+
+            # New dates outside the window of `show_window` stay empty.
+            cal = self._cal.reshape(-1)
+            if self._window is None:
+                cal[self._day_cells[new]] = values
+            self.cells.set_array(self._cal)
+            self._extend_clim(values)
+            self._add_cell_labels(new, cal[self._day_cells[new]])
+            self._update_period_labels(n)
+            self._update_outline()
+        return self
+
+    def _append(self, name: str, new: np.ndarray) -> None:
+        # Set attribute `name` to its array followed by `new`. The arrays are views
+        # of buffers with room to spare, so appending takes amortized constant time.
+        current = getattr(self, name)
+        size = len(current) + len(new)
+        buf = self._buffers.get(name)
+        dtype = np.result_type(current, new)
+        if buf is None or current.base is not buf or len(buf) < size:
+            buf = np.empty(size + size // 4 + 64, dtype=dtype)
+            buf[: len(current)] = current
+            self._buffers[name] = buf
+        elif buf.dtype != dtype:
+            buf = self._buffers[name] = buf.astype(dtype)
+        buf[len(current) : size] = new
+        setattr(self, name, buf[:size])
+
+    def _grow(self, weeks: int) -> None:
+        # Make room for at least `weeks` weeks plus a quarter, and redraw the cells
+        # as a new artist of the larger grid in the same place. The axis limits
+        # are fixed first, so the spare weeks stay out of view.
+        ax = self.ax
+        ax.set(xlim=ax.get_xlim(), ylim=ax.get_ylim())
+        old = self._cal.reshape(-1)[self._day_cells]
+        self._grid_weeks = weeks + weeks // 4 + 4
+        self._day_cells = self._cell_positions(np.arange(len(self.dates)))
+        self._cal = np.full(self._grid_shape(), np.nan)
+        self._cal.reshape(-1)[self._day_cells[: len(old)]] = old
+
+        vmin, vmax = self.cells.get_clim()
+        cells = draw_cells(
+            ax, self._cal, self.cells.get_cmap(), vmin, vmax, self._render
+        )
+        cells.set_zorder(self.cells.get_zorder())
+        self.cells.remove()
+        self.cells = cells
+        if self.colorbar is not None:
+            # Connect the colorbar to the new cells, as `fig.colorbar` does.
+            cells.colorbar = self.colorbar
+            cells.colorbar_cid = cells.callbacks.connect(
+                "changed", self.colorbar.update_normal
+            )
+            self.colorbar.update_normal(cells)
+
+    def _extend_long_axis(self, weeks: int) -> None:
+        if weeks <= 0:
+            return
+        old = self.ax.get_position()
+        if self.horizontal:
+            x0, x1 = self.ax.get_xlim()
+            self.ax.set_xlim(x0, x1 + weeks)
+        else:
+            # Weeks run down the inverted y axis.
+            y0, y1 = self.ax.get_ylim()
+            self.ax.set_ylim(y0 + weeks, y1)
+
+        if self.colorbar is not None:
+            # The axes box shrinks to keep the cells square, so move the colorbar
+            # to keep its distance to, and its height relative to, the box.
+            new = self.ax.get_position()
+            cbar = self.colorbar.ax.get_position()
+            height = new.height * cbar.height / old.height
+            self.colorbar.ax.set_position(
+                [
+                    new.x1 + cbar.x0 - old.x1,
+                    new.y0 + (new.height - height) / 2,
+                    cbar.width,
+                    height,
+                ]
+            )
+
+    def _extend_clim(self, values: np.ndarray) -> None:
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            return
+        vmin, vmax = self.cells.get_clim()
+        self.cells.set_clim(
+            self.cmin or min(vmin, finite.min()), self.cmax or max(vmax, finite.max())
+        )
+
+    def _add_cell_labels(self, new: np.ndarray, cell_values: np.ndarray) -> None:
+        if self.labels is None:
+            return
+        weeks, days = np.divmod(new + self._first_day, 7)
+        rows, cols = (days, weeks) if self.horizontal else (weeks, days)
+        if self._value_format is not None:
+            labels = format_cells(cell_values, self._value_format)
+        elif self._date_label:
+            labels = format_cells(date_parts(self.dates[new])[2], "%d")
+        else:
+            return
+        self.labels.add_labels(rows, cols, labels)
+
+    def _update_period_labels(self, n: int) -> None:
+        # Move the labels of the month and year of date `n - 1`, the last date
+        # before the new ones, and add labels for later months and years.
+        if self._month_label:
+            months, locs = self._period_locs("M", n)
+            move_month_label(self.ax, months, locs, self.horizontal)
+        if self.year_labels is not None:
+            years, locs = self._period_locs("Y", n)
+            last = len(self.year_labels) - 1
+            self.year_labels[last].xy = (
+                (locs[last], 1) if self.horizontal else (0, locs[last])
+            )
+            self.year_labels[last].stale = True
+            for year, loc in zip(years[last + 1 :], locs[last + 1 :]):
+                self.year_labels.append(
+                    add_year_annotation(self.ax, year + 1970, loc, self.horizontal)
+                )
+
+    def _period_locs(self, unit: str, n: int) -> Tuple[List[int], List[float]]:
+        # Periods since 1970 in `unit` and their centres in week coordinates, with
+        # only those from the period of date `n - 1` on recomputed.
+        if unit not in self._periods:
+            all_periods, all_locs, _ = period_locs(self.dates[:n], unit)
+            self._periods[unit] = (all_periods.tolist(), all_locs.tolist())
+        periods, locs = self._periods[unit]
+        begin = self._period_start(unit, n - 1)
+        tail_periods, tail_locs, _ = period_locs(self.dates[begin:], unit)
+        periods[-1:] = tail_periods.tolist()
+        locs[-1:] = (tail_locs + (self._first_day + begin) // 7).tolist()
+        return periods, locs
+
+    def _update_outline(self) -> None:
+        # Months before the last one are complete. Their outline is only set when
+        # a month is completed, and that of the last month is redrawn separately.
+        if self.outline is None:
+            return
+        begin = self._period_start("M", len(self.dates) - 1)
+        if self._outline_tail is None or begin > self._outline_begin:
+            self.outline.set_segments(self._month_outline(0, begin))
+            self._outline_begin = begin
+        tail = self._month_outline(begin, len(self.dates))
+        if self._outline_tail is None:
+            self._outline_tail = draw_month_outline(
+                self.ax, None, self.horizontal, self._month_grid_color, tail
+            )
+        else:
+            self._outline_tail.set_segments(tail)
+
+    def _month_outline(self, start: int, end: int) -> np.ndarray:
+        if start == end:
+            # No complete months yet, e.g. while all dates are in the first month.
+            return np.empty((0, 2, 2))
+        segments = get_month_outline(self.dates[start:end], self.horizontal)
+        # Shift from the first week of the slice to the week of date `start`.
+        segments[..., 0 if self.horizontal else 1] += (self._first_day + start) // 7
+        return segments
+
+    def _period_start(self, unit: str, i: int) -> int:
+        # Index of the first date of the period (e.g. month 'M') of date `i`.
+        start = self.dates[i].astype(f"datetime64[{unit}]").astype("datetime64[D]")
+        return max(int((start - self.dates[0]).astype(int)), 0)
+
+    def _n_weeks(self, n_dates: int) -> int:
+        return (self._first_day + n_dates - 1) // 7 + 1
+
+    def _grid_shape(self) -> Tuple[int, int]:
+        return (7, self._grid_weeks) if self.horizontal else (self._grid_weeks, 7)
+
+    def _cell_positions(self, index: np.ndarray) -> np.ndarray:
+        # Flat position in the grid of the dates at `index` in `self.dates`.
+        weeks, days = np.divmod(index + self._first_day, 7)
+        if self.horizontal:
+            return days * self._grid_weeks + weeks
+        return weeks * 7 + days
+
+    def _to_grid(self, values: np.ndarray) -> np.ndarray:
+        cal = np.full(self._grid_shape(), np.nan)
+        cal.reshape(-1)[self._day_cells] = values
+        return cal
+
+
+def animate(
+    dates: List[Union[str, datetime.date, datetime.datetime]],
+    data: Optional[List[float]] = None,
+    window: int = 30,
+    step: int = 1,
+    interval: float = 100,
+    blit: bool = True,
+    **kwargs,
+) -> FuncAnimation:
+    """Animate a window of dates sliding over a heatmap of input dates and data.
+
+    The heatmap is built once. Each frame shows the values of `window` dates and
+    leaves the others empty, with a fixed color scale. See `HeatmapFigure.animate`.
+
+    Args:
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date if `data` is None.
+        data: List like data structure with numeric data.
+        window: Number of dates in the window.
+        step: Number of dates the window moves by in each frame.
+        interval: Delay between frames in milliseconds.
+        blit: Whether to redraw only the cells (and value labels) in each frame.
+        kwargs: Parameters passed to `HeatmapFigure`, e.g. `cmap` or `colorbar`.
+    Returns:
+        Matplotlib FuncAnimation. Keep a reference to it while it runs.
+    """
+    return HeatmapFigure(dates, data, **kwargs).animate(window, step, interval, blit)
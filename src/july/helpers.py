@@ -1,45 +1,115 @@
 import calendar
+import contextlib
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib as mpl
+from matplotlib.artist import Artist, allow_rasterization
+from matplotlib.font_manager import FontProperties
 from july.colormaps import cmaps_dict
-from matplotlib.pyplot import Axes
-from matplotlib.colors import ListedColormap, LinearSegmentedColormap
-from matplotlib.ticker import ScalarFormatter
-from typing import List, Any, Optional, Union
+from july.profiling import instrument
+from july.rcmod import current_style, style_applied
+from matplotlib.axes import Axes
+from matplotlib.colors import (
+    ListedColormap,
+    LinearSegmentedColormap,
+    Normalize,
+    to_rgba,
+)
+from matplotlib.figure import Figure
+from matplotlib.image import AxesImage
+from matplotlib.cm import ScalarMappable
+from matplotlib.colorbar import Colorbar
+from matplotlib.collections import LineCollection
+from matplotlib.text import Annotation
+from matplotlib.ticker import FixedFormatter, FixedLocator, ScalarFormatter
+from typing import List, Any, Dict, Iterator, Optional, Union, NamedTuple, Tuple
+from contextvars import ContextVar
 from datetime import date
+from july.utils import (
+    QUANTIZED_LEVELS,
+    QUANTIZED_MISSING,
+    check_cell_labels,
+    color_limits,
+    date_parts,
+    date_grid,
+    period_locs,
+    format_cells,
+    value_label_format,
+    get_month_outline,
+)
 
+# Whether figures are created through pyplot. Switched off by `pyplot_free` for
+# the current thread or task only.
+_use_pyplot: ContextVar[bool] = ContextVar("july_use_pyplot", default=True)
 
-def date_grid(
-    dates: List[date], data: List[Any], horizontal: bool, dtype: str = "float64"
-) -> np.ndarray:
-    # Array with columns (iso year, iso week number, iso weekday).
-    iso_dates = np.array([day.isocalendar() for day in dates])
-    # Unique weeks, as defined by the tuple (iso year, iso week).
-    unique_weeks = sorted(list(set([tuple(row) for row in iso_dates[:, :2]])))
 
-    # Get dict that maps week tuple to week index in grid.
-    weeknum2idx = {week: i for i, week in enumerate(unique_weeks)}
-    week_coords = np.array([weeknum2idx[tuple(week)] for week in iso_dates[:, :2]])
-    day_coords = iso_dates[:, 2] - 1
+@contextlib.contextmanager
+def pyplot_free() -> Iterator[None]:
+    """Context manager within which july creates figures without pyplot.
 
-    # Define shape of grid.
-    n_weeks = len(unique_weeks)
-    n_days = 7
+    The figures get an Agg canvas of their own and are not registered with pyplot,
+    so they can be built and saved from several threads at once, and are freed
+    when no longer referenced instead of by `plt.close`. Outside the block, and in
+    other threads, figures are created through pyplot as before.
+    """
+    token = _use_pyplot.set(False)
+    try:
+        yield
+    finally:
+        _use_pyplot.reset(token)
 
-    # Create grid and fill with data.
-    grid = np.empty((n_weeks, n_days), dtype=dtype)
-    grid = np.nan * grid if dtype == "float64" else grid
-    grid[week_coords, day_coords] = data
 
-    if horizontal:
-        return grid.T
+class StyledFigure(Figure):
+    """Figure that is drawn with the style of the `rc_context` it was created in.
+
+    matplotlib reads some rcParams only when a figure is drawn, e.g. the tick label
+    size that sets how many ticks a colorbar gets. The style is applied again for
+    every draw, so the figure looks the same wherever it is drawn or saved.
+    """
+
+    def __init__(self, *args, style: Optional[Dict[str, Any]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._july_style = style
+
+    def draw(self, renderer) -> None:
+        with style_applied(self._july_style):
+            super().draw(renderer)
+
+    def get_tightbbox(self, *args, **kwargs):
+        with style_applied(self._july_style):
+            return super().get_tightbbox(*args, **kwargs)
+
+
+def subplots(nrows: int = 1, ncols: int = 1, squeeze: bool = True, **fig_kw):
+    # `plt.subplots`, or a Figure with an Agg canvas within `pyplot_free`. Either
+    # way, the figure keeps the current style for drawing.
+    fig_kw.update(FigureClass=StyledFigure, style=current_style())
+    if _use_pyplot.get():
+        import matplotlib.pyplot as plt
 
-    return grid
+        return plt.subplots(nrows, ncols, squeeze=squeeze, **fig_kw)
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig_class = fig_kw.pop("FigureClass")
+    fig = fig_class(**fig_kw)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols, squeeze=squeeze)
+
+
+class CalendarArtists(NamedTuple):
+    """Artists created by `draw_calendar` that change with the data."""
+
+    ax: Axes
+    cells: Any
+    labels: Optional["CellLabels"]
+    colorbar: Optional[Colorbar]
+    outline: Optional[LineCollection] = None
+    year_labels: Optional[List[Annotation]] = None
 
 
 def cal_heatmap(
     cal: np.ndarray,
-    dates: List[date],
+    dates: Union[List[date], np.ndarray],
     horizontal: bool,
     cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "Greens",
     value_label: bool = False,
@@ -57,33 +127,78 @@ def cal_heatmap(
     cmax: Optional[int] = None,
     cbar_label_format: Optional[str] = None,
     ax: Optional[Axes] = None,
-):
+    render: str = "mesh",
+) -> Axes:
+    return draw_calendar(
+        cal=cal,
+        dates=dates,
+        horizontal=horizontal,
+        cmap=cmap,
+        value_label=value_label,
+        date_label=date_label,
+        weekday_label=weekday_label,
+        month_label=month_label,
+        year_label=year_label,
+        month_grid=month_grid,
+        month_grid_color=month_grid_color,
+        colorbar=colorbar,
+        frame_on=frame_on,
+        value_format=value_format,
+        title=title,
+        cmin=cmin,
+        cmax=cmax,
+        cbar_label_format=cbar_label_format,
+        ax=ax,
+        render=render,
+    ).ax
+
+
+def draw_calendar(
+    cal: np.ndarray,
+    dates: Union[List[date], np.ndarray],
+    horizontal: bool,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "Greens",
+    value_label: bool = False,
+    date_label: bool = False,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    month_grid: bool = False,
+    month_grid_color: str = "black",
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[int] = None,
+    cmax: Optional[int] = None,
+    cbar_label_format: Optional[str] = None,
+    ax: Optional[Axes] = None,
+    render: str = "mesh",
+) -> CalendarArtists:
     if not ax:
         figsize = (12, 5) if horizontal else (5, 12)
-        fig, ax = plt.subplots(figsize=figsize, dpi=100)
+        fig, ax = subplots(figsize=figsize, dpi=100)
     else:
         fig = ax.get_figure()
 
     if isinstance(cmap, str):
         cmap = cmaps_dict[cmap]
 
-    if value_label and date_label:
-        raise ValueError(
-            "Maximum one of 'value_label' and 'date_label' can be "
-            f"set as 'True'. Got: 'value_label'={value_label} and"
-            f"'date_label'={date_label}."
-        )
+    check_cell_labels(value_label, date_label)
 
-    pc = ax.pcolormesh(cal, edgecolors=ax.get_facecolor(), linewidth=0.25, cmap=cmap)
-    pc.set_clim(cmin or np.nanmin(cal), cmax or np.nanmax(cal))
+    pc = draw_cells(ax, cal, cmap, cmin, cmax, render)
     ax.invert_yaxis()
     ax.set_aspect("equal")
     bbox = ax.get_position()
 
+    labels = None
+    cbar = None
+    outline = None
+    year_labels = None
     if value_label:
-        add_value_label(ax, cal, value_format)
+        labels = add_value_label(ax, cal, value_format)
     if date_label:
-        add_date_label(ax, dates, horizontal)
+        labels = add_date_label(ax, dates, horizontal)
     else:
         ax.set_xticklabels("")
     if weekday_label:
@@ -91,43 +206,363 @@ def cal_heatmap(
     if month_label:
         add_month_label(ax, dates, horizontal)
     if year_label:
-        add_year_label(ax, dates, horizontal)
+        year_labels = add_year_label(ax, dates, horizontal)
     if month_grid:
-        add_month_grid(ax, dates, cal, horizontal, month_grid_color)
+        outline = add_month_grid(ax, dates, horizontal, month_grid_color)
     if colorbar:
-        add_colorbar(pc, fig, ax, bbox, cbar_label_format)
+        mappable = colorbar_mappable(pc, cal, cmin, cmax)
+        cbar = add_colorbar(mappable, fig, ax, bbox, cbar_label_format)
     if title:
         ax.set_title(title)
 
     ax.set_frame_on(frame_on)
-    return ax
+    return CalendarArtists(ax, pc, labels, cbar, outline, year_labels)
 
 
-def add_value_label(ax, cal, value_format):
-    if value_format == "int":
-        val_format = "{:0.0f}"
-    elif value_format == "decimal":
-        val_format = "{:0.1f}"
+def draw_heatmap_grid(
+    cals: np.ndarray,
+    dates: Union[List[date], np.ndarray],
+    horizontal: bool,
+    labels: Optional[List[str]] = None,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "Greens",
+    value_label: bool = False,
+    date_label: bool = False,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    month_grid: bool = False,
+    month_grid_color: str = "black",
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[float] = None,
+    cmax: Optional[float] = None,
+    cbar_label_format: Optional[str] = None,
+    figsize: Optional[Tuple[float, float]] = None,
+    render: str = "mesh",
+) -> np.ndarray:
+    # Grids from `date_grid` with 2-D data, one per series, sharing `dates`.
+    check_cell_labels(value_label, date_label)
+    if isinstance(cmap, str):
+        cmap = cmaps_dict[cmap]
+    if cals.dtype == np.uint8:
+        vmin, vmax = color_limits(cals, cmin, cmax)
     else:
-        raise ValueError(
-            "Argument 'value_format' must be equal to either "
-            f"'int' or 'float'. Got: {value_format}."
+        vmin = np.nanmin(cals) if cmin is None else cmin
+        vmax = np.nanmax(cals) if cmax is None else cmax
+
+    # Layout shared by all heatmaps, computed once.
+    outline = get_month_outline(dates, horizontal) if month_grid else None
+    day_labels = date_label_grid(dates, horizontal) if date_label else None
+
+    n = len(cals)
+    if not figsize:
+        figsize = (12, 0.5 + 1.6 * n) if horizontal else (0.5 + 1.6 * n, 12)
+    fig, axes = subplots(
+        n if horizontal else 1, 1 if horizontal else n, figsize=figsize, squeeze=False
+    )
+    axes = axes.reshape(-1)
+
+    for i, ax in enumerate(axes):
+        pc = draw_cells(ax, cals[i], cmap, vmin, vmax, render)
+        if cals.dtype != np.uint8:
+            # Same color scale everywhere, also when vmin or vmax is zero.
+            pc.set_clim(vmin, vmax)
+        ax.invert_yaxis()
+        ax.set_aspect("equal")
+        ax.set_xticks([])
+        ax.set_yticks([])
+        if value_label:
+            add_value_label(ax, cals[i], value_format)
+        if day_labels is not None:
+            add_cell_labels(ax, day_labels)
+        if weekday_label:
+            add_weekday_label(ax, horizontal)
+        if month_grid:
+            add_month_grid(ax, dates, horizontal, month_grid_color, outline)
+        if labels is not None:
+            add_series_label(ax, labels[i], horizontal)
+        ax.set_frame_on(frame_on)
+
+    # Month labels along the bottom (or left) heatmap, years along the top one.
+    if month_label:
+        add_month_label(axes[-1] if horizontal else axes[0], dates, horizontal)
+    if year_label:
+        add_year_label(axes[0], dates, horizontal)
+    if colorbar:
+        fig.colorbar(
+            colorbar_mappable(pc, cals, cmin, cmax),
+            ax=axes.tolist(),
+            format=cbar_label_format or ScalarFormatter(),
+            fraction=0.02,
         )
+    if title:
+        fig.suptitle(title, fontsize="x-large")
+    return axes
 
-    for (i, j), z in np.ndenumerate(cal):
-        if np.isfinite(z):
-            ax.text(j + 0.5, i + 0.5, val_format.format(z), ha="center", va="center")
 
+def add_series_label(ax, label: str, horizontal: bool) -> None:
+    # Left of a horizontal heatmap, below a vertical one.
+    if horizontal:
+        ax.set_ylabel(label, rotation=0, ha="right", va="center")
+    else:
+        ax.set_xlabel(label)
 
-def add_date_label(ax, dates: List[date], horizontal: bool) -> None:
-    days = [day.day for day in dates]
-    day_grid = date_grid(dates, days, horizontal)
 
-    for (i, j), z in np.ndenumerate(day_grid):
-        if np.isfinite(z):
-            ax.text(j + 0.5, i + 0.5, int(z), ha="center", va="center")
+def draw_hour_grid(
+    cal: np.ndarray,
+    dates: Optional[Union[List[date], np.ndarray]],
+    horizontal: bool,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "Greens",
+    value_label: bool = False,
+    hour_label: bool = True,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[int] = None,
+    cmax: Optional[int] = None,
+    cbar_label_format: Optional[str] = None,
+    ax: Optional[Axes] = None,
+    render: str = "mesh",
+) -> CalendarArtists:
+    # Grid from `hour_grid`, with hours along the short axis. `dates` holds the
+    # day of each row, or is None if the rows are weekdays.
+    if not ax:
+        if dates is None:
+            figsize = (5, 12) if horizontal else (12, 5)
+        else:
+            figsize = (12, 4) if horizontal else (4, 12)
+        fig, ax = subplots(figsize=figsize, dpi=100)
+    else:
+        fig = ax.get_figure()
+
+    if isinstance(cmap, str):
+        cmap = cmaps_dict[cmap]
+
+    pc = draw_cells(ax, cal, cmap, cmin, cmax, render)
+    ax.invert_yaxis()
+    if dates is None:
+        ax.set_aspect("equal")
+    else:
+        # Days are too many to keep cells square, or to separate with edges.
+        ax.set_aspect("auto")
+        if render == "mesh":
+            pc.set_linewidth(0)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    bbox = ax.get_position()
+
+    labels = None
+    cbar = None
+    if value_label:
+        labels = add_value_label(ax, cal, value_format)
+    if hour_label:
+        add_hour_label(ax, horizontal)
+    if dates is None:
+        if weekday_label:
+            add_weekday_label(ax, not horizontal)
+    else:
+        if month_label:
+            add_month_label(ax, dates, horizontal, daily=True)
+        if year_label:
+            add_year_label(ax, dates, horizontal, daily=True)
+    if colorbar:
+        mappable = colorbar_mappable(pc, cal, cmin, cmax)
+        cbar = add_colorbar(mappable, fig, ax, bbox, cbar_label_format)
+    if title:
+        ax.set_title(title)
+
+    ax.set_frame_on(frame_on)
+    return CalendarArtists(ax, pc, labels, cbar)
 
 
+@instrument
+def draw_cells(
+    ax: Axes,
+    cal: np.ndarray,
+    cmap: Union[LinearSegmentedColormap, ListedColormap],
+    cmin: Optional[float],
+    cmax: Optional[float],
+    render: str = "mesh",
+):
+    vmin, vmax = color_limits(cal, cmin, cmax)
+    norm = Normalize(vmin, vmax)
+    if cal.dtype == np.uint8:
+        # Quantized grid: each bin index maps straight to one color, at the centre
+        # of its bin, and missing cells get the (transparent) bad color.
+        cmap = ListedColormap(
+            cmap((np.arange(QUANTIZED_LEVELS) + 0.5) / QUANTIZED_LEVELS)
+        )
+        norm = Normalize(-0.5, QUANTIZED_LEVELS - 0.5)
+        cal = np.ma.masked_equal(cal, QUANTIZED_MISSING)
+    if render == "mesh":
+        pc = ax.pcolormesh(
+            cal, edgecolors=ax.get_facecolor(), linewidth=0.25, cmap=cmap
+        )
+        pc.set_clim(norm.vmin, norm.vmax)
+    elif render == "image":
+        pc = CalendarImage(ax, cal, cmap=cmap, norm=norm)
+        ax.add_image(pc)
+        # Update data limits the same way as ax.imshow.
+        pc.set_extent(pc.get_extent())
+    else:
+        raise ValueError(
+            f"Argument 'render' must be either 'mesh' or 'image'. Got: {render}."
+        )
+    return pc
+
+
+class CalendarImage(AxesImage):
+    """Grid of cells drawn as one RGBA image, with gaps between cells.
+
+    The grid is mapped through the colormap in NumPy whenever the data, norm or
+    colormap changes, so drawing is a single image blit. Gaps are painted in the
+    axes facecolor, like the cell edges of the mesh.
+    """
+
+    cell_px = 10
+
+    def __init__(self, ax: Axes, cal: np.ndarray, **kwargs):
+        nrows, ncols = np.shape(cal)
+        self._gap_rgba = np.round(np.multiply(to_rgba(ax.get_facecolor()), 255))
+        kwargs.setdefault("interpolation", "nearest")
+        super().__init__(ax, origin="lower", extent=(0, ncols, 0, nrows), **kwargs)
+        self.set_data(cal)
+
+    def set_data(self, A) -> None:
+        # Quantized (masked uint8) and float32 grids are kept as they are.
+        if not np.ma.isMaskedArray(A):
+            A = np.asarray(A, dtype=np.result_type(A, np.float32))
+        self._cal = A
+        super().set_data(self._cells_to_rgba())
+
+    def changed(self) -> None:
+        # Re-map cells when the norm or colormap changes.
+        if getattr(self, "_cal", None) is not None:
+            super().set_data(self._cells_to_rgba())
+        super().changed()
+
+    def autoscale(self) -> None:
+        self.norm.autoscale(self._cal)
+
+    def autoscale_None(self) -> None:
+        self.norm.autoscale_None(self._cal)
+
+    def _cells_to_rgba(self) -> np.ndarray:
+        rgba = self.to_rgba(self._cal, bytes=True)
+        k = self.cell_px
+        image = np.repeat(np.repeat(rgba, k, axis=0), k, axis=1)
+        # Emulate cell edges with a line of pixels in every cell.
+        image[k - 1 :: k] = self._gap_rgba
+        image[:, k - 1 :: k] = self._gap_rgba
+        return image
+
+
+class CellLabels(Artist):
+    """Text labels centred in the cells of a grid, drawn by a single artist.
+
+    Labels that do not fit inside their cell at draw time are skipped.
+    """
+
+    zorder = 3
+
+    def __init__(self, labels: np.ndarray):
+        super().__init__()
+        self._fontproperties = FontProperties()
+        self._color = mpl.rcParams["text.color"]
+        self.set_labels(labels)
+
+    def set_labels(self, labels: np.ndarray) -> None:
+        """Set labels from a 2D array of strings. Empty strings are not drawn."""
+        rows, cols = np.nonzero(labels != "")
+        self._xy = np.column_stack([cols + 0.5, rows + 0.5])
+        self._labels = labels[rows, cols]
+        self.stale = True
+
+    def add_labels(self, rows: np.ndarray, cols: np.ndarray, labels: np.ndarray):
+        """Add labels to the cells at `rows` and `cols`, without changing others."""
+        keep = labels != ""
+        xy = np.column_stack([cols[keep] + 0.5, rows[keep] + 0.5])
+        self._xy = np.concatenate([self._xy, xy])
+        self._labels = np.concatenate([self._labels, labels[keep]])
+        self.stale = True
+
+    @allow_rasterization
+    def draw(self, renderer) -> None:
+        if not self.get_visible() or len(self._labels) == 0:
+            return
+
+        trans = self.get_transform()
+        cell_w, cell_h = np.abs(trans.transform((1, 1)) - trans.transform((0, 0)))
+        _, lp_h, lp_d = renderer.get_text_width_height_descent(
+            "lp", self._fontproperties, ismath=False
+        )
+        # Text extents only depend on the string, and there are few unique ones.
+        unique_labels, inverse = np.unique(self._labels, return_inverse=True)
+        extents = np.array(
+            [
+                renderer.get_text_width_height_descent(
+                    label, self._fontproperties, ismath=False
+                )
+                for label in unique_labels
+            ]
+        ).reshape(-1, 3)
+        width = extents[inverse, 0]
+        height = np.maximum(extents[inverse, 1], lp_h)
+        descent = np.maximum(extents[inverse, 2], lp_d)
+
+        # Baseline position of labels that are horizontally and vertically centred.
+        xy = trans.transform(self._xy)
+        x = xy[:, 0] - width / 2
+        y = xy[:, 1] - height / 2 + descent
+        if renderer.flipy():
+            y = renderer.get_canvas_width_height()[1] - y
+        fits = (width <= cell_w) & (height <= cell_h)
+
+        renderer.open_group("cell_labels", self.get_gid())
+        gc = renderer.new_gc()
+        gc.set_foreground(self._color)
+        gc.set_alpha(self.get_alpha())
+        self._set_gc_clip(gc)
+        for xi, yi, label in zip(x[fits], y[fits], self._labels[fits]):
+            renderer.draw_text(gc, xi, yi, label, self._fontproperties, 0)
+        gc.restore()
+        renderer.close_group("cell_labels")
+        self.stale = False
+
+
+def add_cell_labels(ax, cell_labels: np.ndarray) -> CellLabels:
+    labels = CellLabels(cell_labels)
+    ax.add_artist(labels)
+    labels.set_clip_on(False)
+    return labels
+
+
+@instrument
+def add_value_label(ax, cal, value_format) -> CellLabels:
+    if cal.dtype == np.uint8:
+        raise ValueError("Value labels need the values, not a quantized grid.")
+    return add_cell_labels(ax, format_cells(cal, value_label_format(value_format)))
+
+
+def date_label_grid(dates: Union[List[date], np.ndarray], horizontal: bool):
+    _, _, days = date_parts(dates)
+    return format_cells(date_grid(dates, days, horizontal), "%d")
+
+
+@instrument
+def add_date_label(
+    ax, dates: Union[List[date], np.ndarray], horizontal: bool
+) -> CellLabels:
+    return add_cell_labels(ax, date_label_grid(dates, horizontal))
+
+
+@instrument
 def add_weekday_label(ax, horizontal: bool) -> None:
     if horizontal:
         ax.tick_params(axis="y", which="major", pad=8)
@@ -144,70 +579,96 @@ def add_weekday_label(ax, horizontal: bool) -> None:
         ax.xaxis.tick_top()
 
 
-def add_month_label(ax, dates: List[date], horizontal: bool) -> None:
-    month_years = [(day.year, day.month) for day in dates]
-    month_years_str = list(map(str, month_years))
-    month_year_grid = date_grid(dates, month_years_str, horizontal, dtype="object")
-
-    unique_month_years = sorted(set(month_years))
+@instrument
+def add_hour_label(ax, horizontal: bool) -> None:
+    hours = range(0, 24, 3)
+    if horizontal:
+        ax.set_yticks([x + 0.5 for x in hours])
+        ax.set_yticklabels([f"{x:02d}" for x in hours])
+    else:
+        ax.tick_params(axis="x", which="major", pad=4)
+        ax.set_xticks([x + 0.5 for x in hours])
+        ax.set_xticklabels([f"{x:02d}" for x in hours])
+        ax.xaxis.tick_top()
 
-    month_locs = {}
-    for month in unique_month_years:
-        # Get 'avg' x, y coordinates of elements in grid equal to month_year.
-        yy, xx = np.nonzero(month_year_grid == str(month))
-        month_locs[month] = (
-            xx.max() + 1 + xx.min() if horizontal else yy.max() + 1 + yy.min()
-        ) / 2
 
-    # Get month label for each unique month_year.
-    month_labels = [calendar.month_abbr[x[1]] for x in month_locs.keys()]
+@instrument
+def add_month_label(
+    ax, dates: Union[List[date], np.ndarray], horizontal: bool, daily: bool = False
+) -> None:
+    months, month_locs, _ = period_locs(dates, "M", daily)
+    # Get month label for each month, from months since 1970-01.
+    month_labels = [calendar.month_abbr[x % 12 + 1] for x in months.tolist()]
 
     if horizontal:
-        ax.set_xticks([*month_locs.values()])
+        ax.set_xticks(month_locs)
         ax.set_xticklabels(month_labels, ha="center")
     else:
-        ax.set_yticks([*month_locs.values()])
+        ax.set_yticks(month_locs)
         ax.set_yticklabels(month_labels, rotation=90, va="center")
 
 
-def add_year_label(ax, dates, horizontal):
-    years = [day.year for day in dates]
-    year_grid = date_grid(dates, years, horizontal)
-    unique_years = sorted(set(years))
+def move_month_label(ax, months: List[int], month_locs: List[float], horizontal):
+    # Move and relabel the ticks of `add_month_label`. Swapping the locator and
+    # formatter leaves the existing labels as they are, where `set_xticklabels`
+    # updates every tick, so only the ticks of added months are styled.
+    axis = ax.xaxis if horizontal else ax.yaxis
+    n_labelled = len(axis.get_major_locator().locs)
+    axis.set_major_locator(FixedLocator(month_locs))
+    # Index a list, as `calendar.month_abbr` formats the name on every lookup.
+    abbrs = list(calendar.month_abbr)
+    axis.set_major_formatter(FixedFormatter([abbrs[x % 12 + 1] for x in months]))
+    for tick in axis.get_major_ticks(len(month_locs))[n_labelled:]:
+        if horizontal:
+            tick.label1.set_horizontalalignment("center")
+        else:
+            tick.label1.set(rotation=90, verticalalignment="center")
+
+
+@instrument
+def add_year_label(ax, dates, horizontal, daily=False) -> List[Annotation]:
+    years, year_locs, _ = period_locs(dates, "Y", daily)
+    return [
+        add_year_annotation(ax, year, loc, horizontal)
+        for year, loc in zip((years + 1970).tolist(), year_locs.tolist())
+    ]
+
+
+def add_year_annotation(ax, year: int, loc: float, horizontal: bool) -> Annotation:
+    # Anchored at `loc` in data coordinates along the long axis, so the label stays
+    # with its year when the axis limits change.
+    if horizontal:
+        return ax.annotate(
+            year,
+            (loc, 1),
+            (0, 12),
+            xycoords=ax.get_xaxis_transform(),
+            textcoords="offset points",
+            fontsize="large",
+            va="center",
+            ha="center",
+        )
+    return ax.annotate(
+        year,
+        (0, loc),
+        (-40, 0),
+        xycoords=ax.get_yaxis_transform(),
+        textcoords="offset points",
+        fontsize="large",
+        rotation=90,
+        va="center",
+    )
 
-    year_locs = {}
-    for year in unique_years:
-        yy, xx = np.nonzero(year_grid == year)
-        year_locs[year] = (
-            xx.max() + 1 + xx.min() if horizontal else yy.max() + 1 + yy.min()
-        ) / 2
 
-    if horizontal:
-        for year, loc in year_locs.items():
-            ax.annotate(
-                year,
-                (loc / year_grid.shape[1], 1),
-                (0, 12),
-                xycoords="axes fraction",
-                textcoords="offset points",
-                fontsize="large",
-                va="center",
-                ha="center",
-            )
-    else:
-        for year, loc in year_locs.items():
-            ax.annotate(
-                year,
-                (0, 1 - loc / len(year_grid)),
-                (-40, 0),
-                xycoords="axes fraction",
-                textcoords="offset points",
-                fontsize="large",
-                rotation=90,
-                va="center",
-            )
+def colorbar_mappable(pc, cal: np.ndarray, cmin, cmax):
+    # Cells of quantized grids map bin indices to colors, so their colorbar needs
+    # a mappable over the values.
+    if cal.dtype != np.uint8:
+        return pc
+    return ScalarMappable(Normalize(cmin, cmax), pc.get_cmap())
 
 
+@instrument
 def add_colorbar(pc, fig, ax, bbox, cbar_label_format):
     adj_bbox = ax.get_position()
     height_diff = adj_bbox.height - bbox.height
@@ -222,65 +683,24 @@ def add_colorbar(pc, fig, ax, bbox, cbar_label_format):
         ]
     )
     cbar_label_format = cbar_label_format or ScalarFormatter()
-    plt.colorbar(pc, cax=cax, format=cbar_label_format)
+    return fig.colorbar(pc, cax=cax, format=cbar_label_format)
 
 
-def get_month_outline(dates, month_grid, horizontal, month):
-    # This code is so ugly I'm amazed that it works.
-    day_grid = date_grid(dates, dates, horizontal=False, dtype="object")
-    if horizontal:
-        month_grid = month_grid.T
-
-    nrows, ncols = month_grid.shape
-    coords_list = []
-    for y in range(nrows):
-        for x in range(ncols):
-            if np.isfinite(month_grid[y, x]):
-                if day_grid[y, x].month == month:
-                    coords_list.append((x, y))
-
-    sorted_coords = np.array(coords_list)
-    min_y = sorted_coords[:, 1].min()
-    max_y = sorted_coords[:, 1].max()
-    upper_left = sorted_coords[0]
-    upper_right = np.array([7, min_y])
-    lower_right = np.array([7, max_y])
-    lower_right2 = sorted_coords[-1] + np.array([1, 1])
-
-    lower_right1 = (
-        lower_right2
-        if np.array_equal(lower_right, lower_right2)
-        else lower_right2 - np.array([0, 1])
+def draw_month_outline(ax, dates, horizontal, color, segments=None) -> LineCollection:
+    # `segments` from `get_month_outline` can be passed to reuse them across axes.
+    outline = LineCollection(
+        get_month_outline(dates, horizontal) if segments is None else segments,
+        colors=color,
+        linewidths=1,
+        capstyle="projecting",
+        joinstyle="round",
     )
-    lower_left = np.array([0, sorted_coords[:, 1].max() + 1])
-    corner_last = upper_left + np.array([0, 1])
-    second_last = np.copy(corner_last)
-    second_last[0] = 0
+    ax.add_collection(outline, autolim=False)
+    return outline
 
-    coords = np.array(
-        [
-            upper_left,
-            upper_right,
-            lower_right,
-            lower_right1,
-            lower_right2,
-            lower_left,
-            second_last,
-            corner_last,
-            upper_left,
-        ]
-    )
 
-    return coords[:, [1, 0]] if horizontal else coords
-
-
-def add_month_grid(ax, dates, month_grid, horizontal, color):
-    months = set([d.month for d in dates])
-    for month in months:
-        coords = get_month_outline(
-            dates, month_grid, horizontal=horizontal, month=month
-        )
-        ax.plot(coords[:, 0], coords[:, 1], color=color, linewidth=1)
+def add_month_grid(ax, dates, horizontal, color, segments=None) -> LineCollection:
+    outline = draw_month_outline(ax, dates, horizontal, color, segments)
 
     # Pad axes so plotted line appears uniform also along edges.
     ax.set_xlim(ax.get_xlim()[0] - 0.1, ax.get_xlim()[1] + 0.1)
@@ -290,7 +710,7 @@ def add_month_grid(ax, dates, month_grid, horizontal, color):
     # Set frame in facecolor instead of turning off frame to keep cbar alignment.
     for pos in ["top", "bottom", "right", "left"]:
         ax.spines[pos].set_edgecolor(fig.get_facecolor())
-    return ax
+    return outline
 
 
 def get_calendar_title(years: List[int]):
@@ -0,0 +1,342 @@
+import csv
+import itertools
+import zipfile
+import numpy as np
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Sequence, Tuple, Union
+from july.utils import check_agg, reduce_bins, to_timestamps
+
+# Chunks of (timestamps, values), where values is None if no value column is read.
+Chunks = Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]
+
+
+class DailyAggregator:
+    """Aggregate timestamped values into one value per day, one chunk at a time.
+
+    Only one value and one count per day in the date range seen so far is kept in
+    memory, however many values are added.
+
+    Args:
+        agg: Aggregation: 'count', 'sum', 'mean', 'max' or 'min'.
+        tz: Timezone that defines the days. See `to_timestamps`.
+    """
+
+    def __init__(self, agg: str = "count", tz: Optional[Any] = None):
+        check_agg(agg)
+        self.agg = agg
+        self.tz = tz
+        self._first_day = 0
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._values = np.zeros(0)
+
+    def add(
+        self,
+        timestamps: Union[Sequence[Any], np.ndarray],
+        weights: Optional[Union[Sequence[float], np.ndarray]] = None,
+    ) -> "DailyAggregator":
+        """Add a chunk of timestamps, and their values.
+
+        Args:
+            timestamps: List (/np.array/pd.Series) of timestamps.
+            weights: Value of each timestamp. Required unless `agg` is 'count'.
+                Missing (NaN) values are skipped.
+        Returns:
+            The DailyAggregator.
+        """
+        times = to_timestamps(timestamps, tz=self.tz)
+        valid = ~np.isnat(times)
+        values_arr = None
+        if weights is not None and self.agg != "count":
+            values_arr = np.asarray(weights, dtype=float)
+            valid &= ~np.isnan(values_arr)
+            values_arr = values_arr[valid]
+        days = times[valid].astype("datetime64[D]").astype(np.int64)
+        if len(days) == 0:
+            return self
+
+        first_day, last_day = days.min(), days.max()
+        values, counts = reduce_bins(
+            days - first_day,
+            last_day - first_day + 1,
+            weights=values_arr,
+            # Means are kept as sums until `result`.
+            agg="sum" if self.agg == "mean" else self.agg,
+        )
+        self._reserve(first_day, last_day)
+        start = first_day - self._first_day
+        window = slice(start, start + len(counts))
+        self._counts[window] += counts
+        if self.agg in ["sum", "mean"]:
+            self._values[window] += values
+        elif self.agg == "max":
+            self._values[window] = np.fmax(self._values[window], values)
+        elif self.agg == "min":
+            self._values[window] = np.fmin(self._values[window], values)
+        return self
+
+    def _reserve(self, first_day: int, last_day: int) -> None:
+        # Grow the arrays to cover first_day to last_day, keeping what they hold.
+        n_old = len(self._counts)
+        if n_old:
+            first_day = min(first_day, self._first_day)
+            last_day = max(last_day, self._first_day + n_old - 1)
+        n_days = last_day - first_day + 1
+        if n_old == n_days:
+            return
+
+        counts = np.zeros(n_days, dtype=np.int64)
+        values = np.full(n_days, 0.0 if self.agg in ["sum", "mean"] else np.nan)
+        if n_old:
+            old = slice(
+                self._first_day - first_day, self._first_day - first_day + n_old
+            )
+            counts[old] = self._counts
+            values[old] = self._values
+        self._first_day, self._counts, self._values = first_day, counts, values
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the aggregated value of each day.
+
+        Returns:
+            dates: Sorted datetime64[D] array of the days with at least one value.
+            data: Aggregated value of each day in `dates`.
+        """
+        has_values = np.flatnonzero(self._counts)
+        values: np.ndarray
+        if self.agg == "count":
+            values = self._counts
+        elif self.agg == "mean":
+            values = self._values / np.maximum(self._counts, 1)
+        else:
+            values = self._values
+        dates = (self._first_day + has_values).astype("datetime64[D]")
+        return dates, values[has_values]
+
+
+def load_daily(
+    path: Union[str, Path],
+    date_col: Union[str, int],
+    value_col: Optional[Union[str, int]] = None,
+    agg: Optional[str] = None,
+    tz: Optional[Any] = None,
+    chunksize: int = 100_000,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Load a file of timestamped values as one value per day.
+
+    The file is read in chunks of `chunksize` rows, and each chunk is aggregated
+    before the next is read. Memory use is bounded by the chunk size and the number
+    of days, not by the size of the file.
+
+    Supported files:
+        .csv/.tsv: Delimited text with a header row. Columns by name or position.
+        .parquet: Columns by name or position. Requires pyarrow.
+        .npy: Memory-mapped. A structured array with fields `date_col` and
+            `value_col`, a 2-D array with columns at positions `date_col` and
+            `value_col`, or a 1-D array of timestamps.
+        .npz: Members named `date_col` and `value_col`, 1-D arrays of the same
+            length. Members are read in chunks, whether compressed or not.
+
+    Args:
+        path: Path to the file.
+        date_col: Column with the timestamps. Timestamps can be anything accepted
+            by `to_timestamps`, e.g. ISO strings, datetime64 or seconds since epoch.
+        value_col: Column with the values. If None, the rows of each day are
+            counted.
+        agg: Aggregation: 'count', 'sum', 'mean', 'max' or 'min'. Defaults to 'sum'
+            if `value_col` is given, else 'count'.
+        tz: Timezone that defines the days. See `to_timestamps`.
+        chunksize: Number of rows to read at a time.
+    Returns:
+        dates: Sorted datetime64[D] array of the days with at least one value.
+        data: Aggregated value of each day in `dates`.
+
+    Raises:
+        ValueError: If the file type is not supported, or a column is not found.
+    """
+    path = Path(path)
+    agg = agg or ("count" if value_col is None else "sum")
+    if value_col is None and agg != "count":
+        raise ValueError(f"Argument 'value_col' is required when 'agg' is '{agg}'.")
+
+    suffix = path.suffix.lower()
+    chunks: Chunks
+    if suffix in [".csv", ".tsv"]:
+        delimiter = "\t" if suffix == ".tsv" else ","
+        chunks = _iter_csv(path, date_col, value_col, chunksize, delimiter)
+    elif suffix == ".parquet":
+        chunks = _iter_parquet(path, date_col, value_col, chunksize)
+    elif suffix == ".npy":
+        chunks = _iter_npy(path, date_col, value_col, chunksize)
+    elif suffix == ".npz":
+        chunks = _iter_npz(path, date_col, value_col, chunksize)
+    else:
+        raise ValueError(
+            "Expected a .csv, .tsv, .parquet, .npy or .npz file. "
+            f"Got: '{path.name}'."
+        )
+
+    aggregator = DailyAggregator(agg=agg, tz=tz)
+    for timestamps, values in chunks:
+        aggregator.add(timestamps, values)
+    return aggregator.result()
+
+
+def _column_index(columns: Sequence[str], col: Union[str, int]) -> int:
+    if isinstance(col, int):
+        return col
+    if col not in columns:
+        raise ValueError(f"Column '{col}' not found. Columns: {[*columns]}.")
+    return list(columns).index(col)
+
+
+def _iter_csv(
+    path: Path,
+    date_col: Union[str, int],
+    value_col: Optional[Union[str, int]],
+    chunksize: int,
+    delimiter: str,
+) -> Chunks:
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        date_idx = _column_index(header, date_col)
+        value_idx = None if value_col is None else _column_index(header, value_col)
+        while True:
+            rows = list(itertools.islice(reader, chunksize))
+            if not rows:
+                return
+            timestamps = np.array([row[date_idx] for row in rows])
+            values = None
+            if value_idx is not None:
+                # Empty fields are missing values.
+                values = np.array([row[value_idx] or "nan" for row in rows], float)
+            yield timestamps, values
+
+
+def _iter_parquet(
+    path: Path,
+    date_col: Union[str, int],
+    value_col: Optional[Union[str, int]],
+    chunksize: int,
+) -> Chunks:
+    try:
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as err:
+        raise ImportError("Reading Parquet files requires pyarrow.") from err
+
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+    columns = [names[_column_index(names, date_col)]]
+    if value_col is not None:
+        columns.append(names[_column_index(names, value_col)])
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        # Nulls become NaN (or NaT), which are skipped when aggregating.
+        timestamps = batch.column(0).to_numpy(zero_copy_only=False)
+        values = None
+        if value_col is not None:
+            values = batch.column(1).to_numpy(zero_copy_only=False)
+        yield timestamps, values
+
+
+def _iter_npy(
+    path: Path,
+    date_col: Union[str, int],
+    value_col: Optional[Union[str, int]],
+    chunksize: int,
+) -> Chunks:
+    arr = np.load(path, mmap_mode="r")
+    values = None
+    if arr.dtype.names is not None:
+        names = arr.dtype.names
+        timestamps = arr[names[_column_index(names, date_col)]]
+        if value_col is not None:
+            values = arr[names[_column_index(names, value_col)]]
+    elif arr.ndim == 2:
+        if isinstance(date_col, str) or isinstance(value_col, str):
+            raise ValueError(
+                "Columns of a 2-D array are selected by position, not by name. "
+                f"Got: date_col={date_col!r}, value_col={value_col!r}."
+            )
+        timestamps = arr[:, date_col]
+        if value_col is not None:
+            values = arr[:, value_col]
+    elif arr.ndim == 1 and value_col is None:
+        timestamps = arr
+    else:
+        raise ValueError(
+            "Expected a structured array, a 2-D array, or a 1-D array of timestamps "
+            f"without 'value_col'. Got: {arr.ndim}-D array of {arr.dtype}."
+        )
+
+    for start in range(0, len(timestamps), chunksize):
+        chunk = slice(start, start + chunksize)
+        yield (
+            np.asarray(timestamps[chunk]),
+            None if values is None else np.asarray(values[chunk]),
+        )
+
+
+def _open_npz_member(
+    archive: zipfile.ZipFile, name: str
+) -> Tuple[IO[bytes], Tuple[int, ...], np.dtype]:
+    try:
+        f = archive.open(f"{name}.npy")
+    except KeyError:
+        members = [member[: -len(".npy")] for member in archive.namelist()]
+        raise ValueError(f"Array '{name}' not found. Arrays: {members}.") from None
+
+    try:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version in [(2, 0), (3, 0)]:
+            # Version 3.0 only differs from 2.0 in allowing UTF-8 field names, which
+            # the (non-structured) arrays read here do not have.
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            raise ValueError(
+                f"Unsupported .npy format version {version} of array '{name}'."
+            )
+        # Fortran order makes no difference to the 1-D arrays read here.
+        if len(shape) != 1 or dtype.hasobject or dtype.names is not None:
+            raise ValueError(
+                f"Expected '{name}' to be a 1-D array of numbers or datetimes. "
+                f"Got: array of shape {shape} and dtype {dtype}."
+            )
+    except BaseException:
+        f.close()
+        raise
+    return f, shape, dtype
+
+
+def _iter_npz_member(
+    f: IO[bytes], length: int, dtype: np.dtype, chunksize: int
+) -> Iterator:
+    for start in range(0, length, chunksize):
+        count = min(chunksize, length - start)
+        yield np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype)
+
+
+def _iter_npz(
+    path: Path,
+    date_col: Union[str, int],
+    value_col: Optional[Union[str, int]],
+    chunksize: int,
+) -> Chunks:
+    with zipfile.ZipFile(path) as archive:
+        f, shape, dtype = _open_npz_member(archive, str(date_col))
+        with f:
+            timestamps = _iter_npz_member(f, shape[0], dtype, chunksize)
+            if value_col is None:
+                yield from ((chunk, None) for chunk in timestamps)
+                return
+
+            g, value_shape, value_dtype = _open_npz_member(archive, str(value_col))
+            with g:
+                if value_shape != shape:
+                    raise ValueError(
+                        f"Arrays '{date_col}' and '{value_col}' must have the same "
+                        f"length. Got: {shape[0]} and {value_shape[0]}."
+                    )
+                values = _iter_npz_member(g, shape[0], value_dtype, chunksize)
+                yield from zip(timestamps, values)
@@ -1,23 +1,36 @@
 import numpy as np
 import calendar
 import datetime
-import matplotlib.pyplot as plt
 from typing import List, Any, Optional, Union, Tuple
-from matplotlib.pyplot import Axes
+from matplotlib.axes import Axes
 from matplotlib.colors import LinearSegmentedColormap, ListedColormap
 from july.helpers import (
-    date_grid,
     cal_heatmap,
-    get_month_outline,
+    draw_heatmap_grid,
+    draw_hour_grid,
+    draw_month_outline,
     get_calendar_title,
+    subplots,
+)
+from july.utils import (
+    date_grid,
+    fill_masked,
+    preprocess_inputs,
+    preprocess_month,
+    aggregate_events,
+    hour_grid,
+    complete_months,
+    split_months,
+    date_parts,
+    iso_weeks,
+    unique,
 )
-from july.utils import preprocess_inputs, preprocess_month, unique
-from july.rcmod import update_rcparams
+from july.rcmod import rc_context
 
 
 def heatmap(
-    dates: List[Union[str, datetime.date, datetime.datetime]],
-    data: List[float],
+    dates: Union[List[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[List[float], np.ndarray]] = None,
     horizontal: bool = True,
     cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
     value_label: bool = False,
@@ -35,12 +48,15 @@ def heatmap(
     cmax: Optional[int] = None,
     cbar_label_format: Optional[str] = None,
     ax: Optional[Axes] = None,
-    **kwargs
+    render: str = "mesh",
+    fill_missing: Optional[float] = 0,
+    **kwargs,
 ) -> Axes:
     """Create heatmap of input dates and data.
 
     Args:
-        dates: List like data structure with dates.
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date if `data` is None.
         data: List like data structure with numeric data.
         horizontal: Whether to plot heatmap horizontally. Grid shape (7, n_weeks)
             if True, (n_weeks, 7) if False.
@@ -63,43 +79,49 @@ def heatmap(
             Only relevant if 'colorbar' is True.
         cbar_label_format: Format string for colorbar labels.
         ax: Matplotlib Axes object.
+        render: How to draw the cells: 'mesh' draws a pcolormesh with cell
+            edges, 'image' draws a single image, which is much faster to draw
+            and smaller in vector output for long date ranges.
+        fill_missing: Value of the days missing from `dates` within its range.
+            None leaves them empty, like the days outside the range.
         kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
             keyword arguments as defined in `update_rcparams` or a dict with any
             rcParam as key(s).
     Returns:
         Matplotlib Axes object.
     """
-    update_rcparams(**kwargs)
-    dates_clean, data_clean = preprocess_inputs(dates, data)
-    cal = date_grid(dates_clean, data_clean, horizontal)
-    ax = cal_heatmap(
-        cal=cal,
-        dates=dates_clean,
-        horizontal=horizontal,
-        cmap=cmap,
-        value_label=value_label,
-        date_label=date_label,
-        weekday_label=weekday_label,
-        month_label=month_label,
-        year_label=year_label,
-        month_grid=month_grid,
-        month_grid_color=month_grid_color,
-        colorbar=colorbar,
-        frame_on=frame_on,
-        value_format=value_format,
-        title=title,
-        cmin=cmin,
-        cmax=cmax,
-        cbar_label_format=cbar_label_format,
-        ax=ax,
-    )
+    with rc_context(**kwargs):
+        dates_clean, data_clean = preprocess_inputs(dates, data)
+        cal = date_grid(dates_clean, fill_masked(data_clean, fill_missing), horizontal)
+        ax = cal_heatmap(
+            cal=cal,
+            dates=dates_clean,
+            horizontal=horizontal,
+            cmap=cmap,
+            value_label=value_label,
+            date_label=date_label,
+            weekday_label=weekday_label,
+            month_label=month_label,
+            year_label=year_label,
+            month_grid=month_grid,
+            month_grid_color=month_grid_color,
+            colorbar=colorbar,
+            frame_on=frame_on,
+            value_format=value_format,
+            title=title,
+            cmin=cmin,
+            cmax=cmax,
+            cbar_label_format=cbar_label_format,
+            ax=ax,
+            render=render,
+        )
 
-    return ax
+        return ax
 
 
 def month_plot(
-    dates: List[Union[str, datetime.date, datetime.datetime]],
-    data: List[Any],
+    dates: Union[List[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[List[Any], np.ndarray]] = None,
     horizontal: bool = False,
     cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
     value_label: bool = False,
@@ -116,12 +138,14 @@ def month_plot(
     cmax: Optional[int] = None,
     cbar_label_format: Optional[str] = None,
     ax: Optional[Axes] = None,
-    **kwargs
+    fill_missing: Optional[float] = 0,
+    **kwargs,
 ) -> Axes:
     """Create calendar shaped heatmap of one month in input dates and data.
 
     Args:
-        dates: List like data structure with dates.
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date if `data` is None.
         data: List like data structure with numeric data.
         horizontal: Whether to plot heatmap horizontally. Grid shape (7, n_weeks)
             if True, (n_weeks, 7) if False.
@@ -144,18 +168,61 @@ def month_plot(
             Only relevant if 'colorbar' is True.
         cbar_label_format: Format string for colorbar labels.
         ax: Matplotlib Axes object.
+        fill_missing: Value of the days missing from `dates` in the months it
+            spans. None leaves them empty.
         kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
             keyword arguments as defined in `update_rcparams` or a dict with any
             rcParam as key(s).
     Returns:
         Matplotlib Axes object.
     """
-    update_rcparams(**kwargs)
-    dates_mon, data_mon = preprocess_month(dates, data, month=month, year=year)
-    month = dates_mon[0].month
+    with rc_context(**kwargs):
+        dates_mon, data_mon = preprocess_month(dates, data, month=month, year=year)
+        return _month_plot(
+            dates_mon,
+            fill_masked(data_mon, fill_missing),
+            horizontal=horizontal,
+            cmap=cmap,
+            value_label=value_label,
+            date_label=date_label,
+            weeknum_label=weeknum_label,
+            month_label=month_label,
+            colorbar=colorbar,
+            value_format=value_format,
+            cal_mode=cal_mode,
+            title=title,
+            cmin=cmin,
+            cmax=cmax,
+            cbar_label_format=cbar_label_format,
+            ax=ax,
+        )
+
+
+def _month_plot(
+    dates_mon: np.ndarray,
+    data_mon: np.ndarray,
+    horizontal: bool = False,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
+    value_label: bool = False,
+    date_label: bool = False,
+    weeknum_label: bool = True,
+    month_label: bool = True,
+    colorbar: bool = False,
+    value_format: str = "int",
+    cal_mode: bool = False,
+    title: Optional[str] = None,
+    cmin: Optional[int] = None,
+    cmax: Optional[int] = None,
+    cbar_label_format: Optional[str] = None,
+    ax: Optional[Axes] = None,
+) -> Axes:
+    """Render one complete, preprocessed month. See `month_plot` for arguments."""
+    month = int(date_parts(dates_mon[:1])[1][0])
     month_grid = date_grid(dates_mon, data_mon, horizontal=horizontal)
     weeknum_grid = date_grid(
-        dates_mon, [d.isocalendar()[1] for d in dates_mon], horizontal=horizontal
+        dates_mon,
+        iso_weeks(dates_mon),
+        horizontal=horizontal,
     )
     weeknum_labels: List[Any] = [int(x) for x in unique(weeknum_grid) if np.isfinite(x)]
 
@@ -166,7 +233,7 @@ def month_plot(
             weeknum_labels.append("")
 
     if not ax:
-        _, ax = plt.subplots(figsize=(5, 4))
+        _, ax = subplots(figsize=(5, 4))
 
     ax = cal_heatmap(
         cal=month_grid,
@@ -201,21 +268,20 @@ def month_plot(
         else:
             ax.set_yticklabels([])
 
-    outline_coords = get_month_outline(dates_mon, month_grid, horizontal, month)
-    ax.plot(outline_coords[:, 0], outline_coords[:, 1], color="black", linewidth=1)
+    draw_month_outline(ax, dates_mon, horizontal, "black")
     ax.set_xlim(ax.get_xlim()[0] - 0.1, ax.get_xlim()[1] + 0.1)
     ax.set_ylim(ax.get_ylim()[0] + 0.1, ax.get_ylim()[1] - 0.1)
     if month_label:
         ax.set_title(calendar.month_name[month])
     if title:
-        plt.suptitle(title, y=1.07, size="x-large")
+        ax.get_figure().suptitle(title, y=1.07, size="x-large")
 
     return ax
 
 
 def calendar_plot(
-    dates: List[Union[str, datetime.date, datetime.datetime]],
-    data: List[Any],
+    dates: Union[List[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[List[Any], np.ndarray]] = None,
     cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
     value_label: bool = False,
     date_label: bool = False,
@@ -225,12 +291,14 @@ def calendar_plot(
     title: bool = True,
     ncols: int = 4,
     figsize: Optional[Tuple[float, float]] = None,
-    **kwargs
+    fill_missing: Optional[float] = 0,
+    **kwargs,
 ) -> Axes:
     """Create calendar shaped heatmap of all months im input dates and data.
 
     Args:
-        dates: List like data structure with dates.
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date if `data` is None.
         data: List like data structure with numeric data.
         cmap: Colormap. Any matplotlib colormap works.
         value_label: Whether to add value label inside grid.
@@ -243,57 +311,288 @@ def calendar_plot(
         ncols: Number of columns in the calendar plot.
         ax: Matplotlib Axes object.
         figsize: Figure size. Defaults to sensible values determined from 'ncols'.
+        fill_missing: Value of the days missing from `dates` in the months it
+            spans. None leaves them empty.
         kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
             keyword arguments as defined in `update_rcparams` or a dict with any
             rcParam as key(s).
     Returns:
         Matplotlib Axes object.
     """
-    update_rcparams(**kwargs)
-    dates_clean, data_clean = preprocess_inputs(dates, data)
-    # Get unique years in input dates.
-    years = sorted(set([day.year for day in dates_clean]))
-    # Get unique months (YYYY-MM) in input dates.
-    year_months = sorted(set([day.strftime("%Y-%m") for day in dates_clean]))
-
-    nrows = int(np.ceil(len(year_months) / ncols))
-    if not figsize:
-        if ncols == 6:
-            figsize = (12, 0.5 + nrows * 2)
-        elif ncols == 5:
-            figsize = (12, 1 + nrows * 2)
-        elif ncols == 4:
-            figsize = (14, 2 + nrows * 2)
-        elif ncols == 3:
-            figsize = (12, 2 + nrows * 2)
-
-    fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
-
-    for i, year_month in enumerate(year_months):
-        month = [day for day in dates_clean if day.strftime("%Y-%m") == year_month]
-        vals = [
-            val
-            for day, val in zip(dates_clean, data_clean)
-            if day.strftime("%Y-%m") == year_month
-        ]
-        month_plot(
-            month,  # type: ignore
-            vals,
+    with rc_context(**kwargs):
+        dates_clean, data_clean = preprocess_inputs(dates, data)
+        # Get unique years in input dates.
+        years = np.unique(date_parts(dates_clean)[0]).tolist()
+        # Split input into whole months in one pass.
+        dates_full, data_full = complete_months(dates_clean, data_clean)
+        year_months = split_months(dates_full, fill_masked(data_full, fill_missing))
+
+        nrows = int(np.ceil(len(year_months) / ncols))
+        if not figsize:
+            if ncols == 6:
+                figsize = (12, 0.5 + nrows * 2)
+            elif ncols == 5:
+                figsize = (12, 1 + nrows * 2)
+            elif ncols == 4:
+                figsize = (14, 2 + nrows * 2)
+            elif ncols == 3:
+                figsize = (12, 2 + nrows * 2)
+
+        fig, axes = subplots(nrows, ncols, figsize=figsize)
+
+        for i, (month, vals) in enumerate(year_months):
+            _month_plot(
+                month,
+                vals,
+                cmap=cmap,
+                date_label=date_label,
+                weeknum_label=weeknum_label,
+                month_label=month_label,
+                value_label=value_label,
+                value_format=value_format,
+                ax=axes.reshape(-1)[i],
+                cal_mode=True,
+            )
+
+        for ax in axes.reshape(-1)[len(year_months) :]:
+            ax.set_visible(False)
+
+        fig.subplots_adjust(wspace=0.75, hspace=0.5)
+        if title:
+            fig.suptitle(get_calendar_title(years), fontsize="x-large", y=1.03)
+
+        return axes
+
+
+def heatmap_grid(
+    dates: Union[List[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Union[List[List[float]], np.ndarray],
+    labels: Optional[List[str]] = None,
+    horizontal: bool = True,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
+    value_label: bool = False,
+    date_label: bool = False,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    month_grid: bool = False,
+    month_grid_color: str = "black",
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[float] = None,
+    cmax: Optional[float] = None,
+    cbar_label_format: Optional[str] = None,
+    figsize: Optional[Tuple[float, float]] = None,
+    render: str = "mesh",
+    fill_missing: Optional[float] = 0,
+    **kwargs,
+) -> np.ndarray:
+    """Create one heatmap per series, all over the same dates and color scale.
+
+    The dates, grid layout, labels and month outlines are computed once and shared
+    by all heatmaps, so the cost of each extra series is mostly drawing its cells.
+
+    Args:
+        dates: List like data structure with dates.
+        data: 2-D array (or list of lists) with one row of values per series and
+            one column per date in `dates`.
+        labels: Label of each series, shown next to its heatmap.
+        horizontal: Whether to plot heatmaps horizontally, stacked in one column.
+            If False, they are plotted vertically, side by side in one row.
+        cmap: Colormap. Any matplotlib colormap works.
+        value_label: Whether to add value label inside grids.
+        date_label: Whether to add date label inside grids.
+        weekday_label: Whether to label the short axis of every heatmap with
+            weekday abbreviations.
+        month_label: Whether to add month label(s) along the long axis of the last
+            (horizontal) or first (vertical) heatmap.
+        year_label: Whether to add year label(s) along the long axis of the first
+            heatmap.
+        month_grid: Whether to outline each month in the grids.
+        month_grid_color: Color to use for month grid outline.
+        colorbar: Whether to add one colorbar for all heatmaps.
+        frame_on: Whether to turn frames on.
+        value_format: Format of value_label: 'int' or 'decimal'. Only relevant if
+            `value_label` is True.
+        title: Title of the figure.
+        cmin: Minimum value of the color scale. Defaults to minimum value of `data`.
+        cmax: Maximum value of the color scale. Defaults to maximum value of `data`.
+        cbar_label_format: Format string for colorbar labels.
+        figsize: Figure size. Defaults to a size that fits the number of series.
+        render: How to draw the cells: 'mesh' or 'image'. See `heatmap`.
+        fill_missing: Value of the days missing from `dates` within its range.
+            None leaves them empty, like the days outside the range.
+        kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
+            keyword arguments as defined in `update_rcparams` or a dict with any
+            rcParam as key(s).
+    Returns:
+        Array of Matplotlib Axes objects, one per series.
+    """
+    values = np.ma.asarray(data)
+    if values.ndim != 2 or values.shape[1] != len(dates):
+        raise ValueError(
+            "Expected 'data' to be 2-D with one column per date. "
+            f"Got shape {values.shape} and {len(dates)} dates."
+        )
+    if values.size == 0:
+        raise ValueError(
+            "Expected 'data' to have at least one row and one date. "
+            f"Got shape {values.shape}."
+        )
+    if labels is not None and len(labels) != len(values):
+        raise ValueError(
+            "Expected one label per row of 'data'. "
+            f"Got: {len(labels)} labels and {len(values)} rows."
+        )
+
+    with rc_context(**kwargs):
+        # Preprocess the dates once, as indices into the columns of `data`.
+        dates_clean, index = preprocess_inputs(dates, np.arange(values.shape[1]))
+        values = values[:, fill_masked(index, 0)]
+        values[:, np.ma.getmaskarray(index)] = np.ma.masked
+        cals = date_grid(dates_clean, fill_masked(values, fill_missing), horizontal)
+        return draw_heatmap_grid(
+            cals=cals,
+            dates=dates_clean,
+            horizontal=horizontal,
+            labels=labels,
             cmap=cmap,
+            value_label=value_label,
             date_label=date_label,
-            weeknum_label=weeknum_label,
+            weekday_label=weekday_label,
             month_label=month_label,
-            value_label=value_label,
+            year_label=year_label,
+            month_grid=month_grid,
+            month_grid_color=month_grid_color,
+            colorbar=colorbar,
+            frame_on=frame_on,
             value_format=value_format,
-            ax=axes.reshape(-1)[i],
-            cal_mode=True,
+            title=title,
+            cmin=cmin,
+            cmax=cmax,
+            cbar_label_format=cbar_label_format,
+            figsize=figsize,
+            render=render,
         )
 
-    for ax in axes.reshape(-1)[len(year_months) :]:
-        ax.set_visible(False)
 
-    plt.subplots_adjust(wspace=0.75, hspace=0.5)
-    if title:
-        plt.suptitle(get_calendar_title(years), fontsize="x-large", y=1.03)
+def heatmap_from_events(
+    timestamps: List[Union[str, datetime.date, datetime.datetime, float]],
+    weights: Optional[List[float]] = None,
+    agg: str = "count",
+    tz: Optional[Any] = None,
+    **kwargs,
+) -> Axes:
+    """Create heatmap of raw event timestamps, aggregated into one value per day.
 
-    return axes
+    Args:
+        timestamps: List like data structure with event timestamps: dates,
+            datetimes, ISO strings, datetime64 or seconds since 1970-01-01 UTC.
+        weights: List like data structure with the value of each event. Required
+            unless `agg` is 'count'.
+        agg: How to aggregate the events of a day: 'count', 'sum', 'mean', 'max'
+            or 'min'.
+        tz: Timezone that defines the days, as an IANA name (e.g. 'Europe/Oslo')
+            or a datetime.tzinfo. If given, naive timestamps are taken to be in UTC.
+        kwargs: Parameters passed to `heatmap`.
+    Returns:
+        Matplotlib Axes object.
+    """
+    dates, data = aggregate_events(timestamps, weights=weights, agg=agg, tz=tz)
+    return heatmap(dates, data, **kwargs)
+
+
+def hour_heatmap(
+    timestamps: List[Union[str, datetime.date, datetime.datetime, float]],
+    weights: Optional[List[float]] = None,
+    agg: str = "count",
+    by: str = "day",
+    tz: Optional[Any] = None,
+    horizontal: Optional[bool] = None,
+    cmap: Union[str, LinearSegmentedColormap, ListedColormap] = "july",
+    value_label: bool = False,
+    hour_label: bool = True,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[int] = None,
+    cmax: Optional[int] = None,
+    cbar_label_format: Optional[str] = None,
+    ax: Optional[Axes] = None,
+    render: str = "mesh",
+    **kwargs,
+) -> Axes:
+    """Create heatmap of raw event timestamps by hour of day and day (or weekday).
+
+    Args:
+        timestamps: List like data structure with event timestamps: dates,
+            datetimes, ISO strings, datetime64 or seconds since 1970-01-01 UTC.
+        weights: List like data structure with the value of each event. Required
+            unless `agg` is 'count'.
+        agg: How to aggregate the events of an hour: 'count', 'sum', 'mean', 'max'
+            or 'min'.
+        by: 'day' for one column per day from the first to the last event, or
+            'weekday' for one column per weekday, with the events of all weeks
+            aggregated together.
+        tz: Timezone that defines the hours and days, as an IANA name (e.g.
+            'Europe/Oslo') or a datetime.tzinfo. If given, naive timestamps are
+            taken to be in UTC.
+        horizontal: Whether to plot days (or weekdays) along the x axis and hours
+            along the y axis. Grid shape (24, n) if True, (n, 24) if False.
+            Defaults to True if `by` is 'day', and False if 'weekday'.
+        cmap: Colormap. Any matplotlib colormap works.
+        value_label: Whether to add value label inside grid.
+        hour_label: Whether to label the hour axis.
+        weekday_label: Whether to label the weekdays. Only relevant if `by` is
+            'weekday'.
+        month_label: Whether to add month label(s) along the day axis. Only
+            relevant if `by` is 'day'.
+        year_label: Whether to add year label(s) along the day axis. Only relevant
+            if `by` is 'day'.
+        colorbar: Whether to add colorbar.
+        frame_on: Whether to turn frame on.
+        value_format: Format of value_label: 'int' or 'decimal'. Only relevant if
+            `value_label` is True.
+        title: Title of the plot.
+        cmin: Minimum value of the colorbar. Defaults to minimum value of the grid.
+        cmax: Maximum value of the colorbar. Defaults to maximum value of the grid.
+        cbar_label_format: Format string for colorbar labels.
+        ax: Matplotlib Axes object.
+        render: How to draw the cells: 'mesh' or 'image'. See `heatmap`.
+        kwargs: Parameters passed to `update_rcparams`. Figure aesthetics. Named
+            keyword arguments as defined in `update_rcparams` or a dict with any
+            rcParam as key(s).
+    Returns:
+        Matplotlib Axes object.
+    """
+    if horizontal is None:
+        horizontal = by == "day"
+
+    with rc_context(**kwargs):
+        grid, dates = hour_grid(timestamps, weights=weights, agg=agg, by=by, tz=tz)
+        return draw_hour_grid(
+            cal=grid.T if horizontal else grid,
+            dates=dates,
+            horizontal=horizontal,
+            cmap=cmap,
+            value_label=value_label,
+            hour_label=hour_label,
+            weekday_label=weekday_label,
+            month_label=month_label,
+            year_label=year_label,
+            colorbar=colorbar,
+            frame_on=frame_on,
+            value_format=value_format,
+            title=title,
+            cmin=cmin,
+            cmax=cmax,
+            cbar_label_format=cbar_label_format,
+            ax=ax,
+            render=render,
+        ).ax
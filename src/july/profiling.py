@@ -0,0 +1,217 @@
+import contextlib
+import functools
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Called with (stage, seconds, peak_bytes) after every instrumented call, while
+# enabled. peak_bytes is None unless memory is traced.
+Callback = Callable[[str, float, Optional[int]], None]
+
+# Whether any profile (in any thread) or callback is active. Instrumented
+# functions check this flag only, so they cost next to nothing while disabled.
+_enabled = False
+# Profiles of the current thread or task only, so that concurrent profiles do not
+# record each other's stages.
+_profiles: ContextVar[Tuple["Profile", ...]] = ContextVar("july_profiles", default=())
+_n_profiles = 0
+_callbacks: List[Callback] = []
+_lock = threading.Lock()
+_local = threading.local()
+# Original matplotlib Figure methods, while they are wrapped.
+_figure_methods: Dict[str, Any] = {}
+
+
+class Profile:
+    """Wall time, call counts and optionally peak memory of each stage, collected
+    by `profile`.
+
+    Args:
+        trace_memory: Whether to record the peak memory allocated during each
+            stage with tracemalloc.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, seconds: float, peak_bytes: Optional[int]) -> None:
+        """Add one call of `stage` to the statistics."""
+        with _lock:
+            stats = self.stats.setdefault(
+                stage,
+                {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_bytes": None},
+            )
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            if peak_bytes is not None:
+                stats["peak_bytes"] = max(stats["peak_bytes"] or 0, peak_bytes)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Get the statistics as one dict per stage, e.g. to export as metrics.
+
+        Returns:
+            List of dicts with keys 'stage', 'calls', 'seconds' (total),
+            'max_seconds' and 'peak_bytes' (None unless memory is traced), slowest
+            stage first.
+        """
+        records = [{"stage": stage, **stats} for stage, stats in self.stats.items()]
+        return sorted(records, key=lambda record: -record["seconds"])
+
+    def report(self) -> str:
+        """Get the statistics as a table, slowest stage first."""
+        lines = [
+            f"{'stage':<20} {'calls':>7} {'total ms':>10} {'max ms':>10} "
+            f"{'peak KiB':>10}"
+        ]
+        for record in self.to_records():
+            peak = record["peak_bytes"]
+            lines.append(
+                f"{record['stage']:<20} {record['calls']:>7} "
+                f"{record['seconds'] * 1000:>10.2f} "
+                f"{record['max_seconds'] * 1000:>10.2f} "
+                f"{'-' if peak is None else f'{peak / 1024:.1f}':>10}"
+            )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(trace_memory: bool = False) -> Iterator[Profile]:
+    """Context manager that profiles july's internal stages within its block.
+
+    Stages are `preprocess_inputs`, `to_datetime64`, `date_grid`, `hour_grid`,
+    `draw_cells`, the `add_*_label` functions, `get_month_outline`, `add_colorbar`,
+    and the matplotlib figure `draw` and `savefig` (which includes the draw).
+    Only stages run in the same thread or asyncio task as the block are recorded.
+
+    Example:
+        >>> with july.profile() as prof:
+        ...     july.heatmap(dates, data).get_figure().savefig("heatmap.png")
+        >>> print(prof.report())
+
+    Args:
+        trace_memory: Whether to record the peak memory allocated during each
+            stage with tracemalloc. Slows down the profiled code.
+    Returns:
+        Profile with the statistics of each stage.
+    """
+    prof = Profile(trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _count_profile(1)
+    token = _profiles.set((*_profiles.get(), prof))
+    try:
+        yield prof
+    finally:
+        _profiles.reset(token)
+        _count_profile(-1)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def add_callback(callback: Callback) -> None:
+    """Call `callback(stage, seconds, peak_bytes)` after every instrumented stage,
+    in any thread, until removed with `remove_callback`. See `profile` for the
+    stages.
+    """
+    with _lock:
+        _callbacks.append(callback)
+    _update_enabled()
+
+
+def remove_callback(callback: Callback) -> None:
+    """Stop calling a callback added with `add_callback`."""
+    with _lock:
+        _callbacks.remove(callback)
+    _update_enabled()
+
+
+def instrument(func: F) -> F:
+    """Decorator that records the calls of `func` as a stage, named after it."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        with _stage(name):
+            return func(*args, **kwargs)
+
+    return cast(F, wrapper)
+
+
+def _count_profile(change: int) -> None:
+    global _n_profiles
+    with _lock:
+        _n_profiles += change
+    _update_enabled()
+
+
+def _update_enabled() -> None:
+    global _enabled
+    with _lock:
+        enabled = bool(_n_profiles or _callbacks)
+        changed = enabled != _enabled
+        _enabled = enabled
+        # Under the lock, as profiles in several threads start and stop at once.
+        if changed and enabled:
+            _wrap_figure_methods()
+        elif changed:
+            _unwrap_figure_methods()
+
+
+def _wrap_figure_methods() -> None:
+    from matplotlib.figure import Figure
+
+    for name in ["draw", "savefig"]:
+        method = _figure_methods[name] = Figure.__dict__[name]
+        setattr(Figure, name, instrument(method))
+
+
+def _unwrap_figure_methods() -> None:
+    from matplotlib.figure import Figure
+
+    for name, method in _figure_methods.items():
+        setattr(Figure, name, method)
+    _figure_methods.clear()
+
+
+@contextlib.contextmanager
+def _stage(name: str) -> Iterator[None]:
+    # Peaks of nested stages are folded into the enclosing stage, as each stage
+    # resets the tracemalloc peak.
+    stack = _local.__dict__.setdefault("stack", [])
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            # Python 3.9+. Before, peaks are since tracing started.
+            tracemalloc.reset_peak()
+        stack.append([current, current])
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_bytes = None
+        if tracing:
+            _, peak = tracemalloc.get_traced_memory()
+            base, nested_peak = stack.pop()
+            peak = max(peak, nested_peak)
+            peak_bytes = peak - base
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+
+        for prof in _profiles.get():
+            prof.record(name, seconds, peak_bytes if prof.trace_memory else None)
+        for callback in list(_callbacks):
+            callback(name, seconds, peak_bytes)
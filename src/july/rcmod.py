@@ -1,20 +1,204 @@
-import warnings
+import contextlib
+import threading
 import matplotlib as mpl
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
 
+# Resolved styles by repr of the keyword arguments they were created from.
+_style_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_STYLE_CACHE_SIZE = 128
+_cache_lock = threading.Lock()
 
-class ConfigDict(dict):
-    """Dictionary that raises KeyError when trying to create new keys."""
 
-    def __setitem__(self, key, val):
-        """Raises:
-        KeyError: If 'key' is not an existing key in the dictionary.
-        """
-        if key not in self.keys():
+class _StyleLock:
+    """Lock on the global rcParams, shared by threads that apply the same style.
+
+    matplotlib reads rcParams while it builds and draws figures. The first thread
+    to enter applies its style, and threads with the same style join it and run
+    at the same time. A thread with another style waits until all have left, and
+    threads that arrive after it wait behind it, so it is not starved. Nested
+    styles are applied on top of the style of the enclosing block.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        # Style applied now, by the threads holding the lock.
+        self._style: Optional[Dict[str, Any]] = None
+        self._holders = 0
+        self._previous: Dict[str, Any] = {}
+        # Styles of the threads waiting for the lock.
+        self._waiting: List[Optional[Dict[str, Any]]] = []
+        self._local = threading.local()
+
+    def _stack(self) -> List[Optional[Dict[str, Any]]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _can_enter(self, style: Optional[Dict[str, Any]]) -> bool:
+        if self._holders == 0:
+            return True
+        return style is not None and style == self._style
+
+    def _enter(self, style: Optional[Dict[str, Any]]) -> None:
+        # A style of None takes the lock alone, and applies nothing.
+        with self._cond:
+            if self._waiting or not self._can_enter(style):
+                # Threads take the lock in the order they started waiting.
+                self._waiting.append(style)
+                try:
+                    while self._waiting[0] != style or not self._can_enter(style):
+                        self._cond.wait()
+                finally:
+                    self._waiting.remove(style)
+            if self._holders == 0:
+                self._previous = {} if style is None else _apply_style(style)
+                self._style = style
+            self._holders += 1
+            self._cond.notify_all()
+
+    def _leave(self) -> None:
+        with self._cond:
+            self._holders -= 1
+            if self._holders == 0:
+                dict.update(mpl.rcParams, self._previous)
+                self._style = None
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def hold(self, style: Optional[Dict[str, Any]]) -> Iterator[None]:
+        """Hold the lock with `style` applied. None holds it alone."""
+        stack = self._stack()
+        outer = stack[-1] if stack else None
+        if style is not None and outer is not None:
+            style = {**outer, **style}
+        if stack and style is not None and style == outer:
+            # Same style as the enclosing block, which holds the lock already.
+            stack.append(style)
+            try:
+                yield
+            finally:
+                stack.pop()
+            return
+
+        # Leave the lock while another style is needed, so that threads which
+        # share the enclosing style are not waited for while they wait for us.
+        if stack:
+            self._leave()
+        self._enter(style)
+        stack.append(style)
+        try:
+            yield
+        finally:
+            stack.pop()
+            self._leave()
+            if stack:
+                self._enter(stack[-1])
+
+
+_style_lock = _StyleLock()
+
+
+def _resolve_style(
+    fontfamily="monospace",
+    fontsize=12,
+    labelsize="medium",
+    titlesize="large",
+    titlepad=30,
+    facecolor="white",
+    edgecolor="black",
+    linewidth=1,
+    xmargin=0,
+    ymargin=0,
+    xtickmajorsize=0,
+    ytickmajorsize=0,
+    dpi=100,
+    rc_params_dict=None,
+) -> Dict[str, Any]:
+    style = {
+        "font.family": fontfamily,
+        "font.size": fontsize,
+        "axes.labelsize": labelsize,
+        "axes.titlesize": titlesize,
+        "axes.titlepad": titlepad,
+        "axes.facecolor": facecolor,
+        "axes.edgecolor": edgecolor,
+        "axes.linewidth": linewidth,
+        "axes.xmargin": xmargin,
+        "axes.ymargin": ymargin,
+        "xtick.major.size": xtickmajorsize,
+        "ytick.major.size": ytickmajorsize,
+        "figure.dpi": dpi,
+    }
+    style.update(rc_params_dict or {})
+    for key, val in style.items():
+        if key not in mpl.rcParams.validate:
             raise KeyError(
-                f"Key '{key}' is not a valid key. " f"Valid keys: {[*self.keys()]}."
+                f"Key '{key}' is not a valid key. "
+                "Valid keys are the keys of matplotlib.rcParams."
             )
-        else:
-            super().__setitem__(key, val)
+        style[key] = mpl.rcParams.validate[key](val)
+    return style
+
+
+def resolve_style(**kwargs) -> Dict[str, Any]:
+    """Get the validated rcParams for the keyword arguments of `update_rcparams`.
+
+    Resolved styles are cached, so repeated calls with the same arguments are cheap.
+    """
+    key = repr(sorted(kwargs.items()))
+    with _cache_lock:
+        if key in _style_cache:
+            _style_cache.move_to_end(key)
+            return _style_cache[key]
+
+        style = _resolve_style(**kwargs)
+        _style_cache[key] = style
+        if len(_style_cache) > _STYLE_CACHE_SIZE:
+            _style_cache.popitem(last=False)
+        return style
+
+
+def _apply_style(style: Dict[str, Any]) -> Dict[str, Any]:
+    """Set the rcParams in `style` that differ, and return their previous values."""
+    changed = {key: val for key, val in style.items() if mpl.rcParams[key] != val}
+    previous = {key: mpl.rcParams[key] for key in changed}
+    # Values are validated in `resolve_style`, so skip validation here.
+    dict.update(mpl.rcParams, changed)
+    return previous
+
+
+@contextlib.contextmanager
+def rc_context(**kwargs) -> Iterator[None]:
+    """Context manager that applies the style of `update_rcparams` within its
+    block, and restores the previous rcParams on exit. Only the rcParams that
+    differ from the current ones are changed. Threads with the same style run
+    their blocks at the same time, and threads with another style wait for them
+    to finish before they apply theirs.
+
+    Figures that july creates within the block keep the style, and apply it again
+    whenever they are drawn (see `july.helpers.StyledFigure`). Figures created by
+    the caller, e.g. for the `ax` argument of the plots, are drawn with the
+    rcParams in effect when they are drawn.
+    """
+    with _style_lock.hold(resolve_style(**kwargs)):
+        yield
+
+
+def current_style() -> Optional[Dict[str, Any]]:
+    """Get the style applied by the innermost `rc_context` of this thread, if any."""
+    stack = _style_lock._stack()
+    return stack[-1] if stack else None
+
+
+@contextlib.contextmanager
+def style_applied(style: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """Like `rc_context`, for a style from `current_style`. None applies nothing."""
+    if style is None:
+        yield
+        return
+    with _style_lock.hold(style):
+        yield
 
 
 def update_rcparams(
@@ -34,22 +218,22 @@ def update_rcparams(
     rc_params_dict=None,
 ):
     """Wrapper around mpl.rcParams dict to easily set some key settings."""
-    rc_params_dict = rc_params_dict or {}
-    rcmod = ConfigDict(mpl.rcParams)
-    rcmod["font.family"] = fontfamily
-    rcmod["font.size"] = fontsize
-    rcmod["axes.labelsize"] = labelsize
-    rcmod["axes.titlesize"] = titlesize
-    rcmod["axes.titlepad"] = titlepad
-    rcmod["axes.facecolor"] = facecolor
-    rcmod["axes.edgecolor"] = edgecolor
-    rcmod["axes.linewidth"] = linewidth
-    rcmod["axes.xmargin"] = xmargin
-    rcmod["axes.ymargin"] = ymargin
-    rcmod["xtick.major.size"] = xtickmajorsize
-    rcmod["ytick.major.size"] = ytickmajorsize
-    rcmod["figure.dpi"] = dpi
-    rcmod.update(rc_params_dict)
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", mpl.cbook.MatplotlibDeprecationWarning)
-        mpl.rcParams.update(rcmod)
+    with _style_lock.hold(None):
+        _apply_style(
+            resolve_style(
+                fontfamily=fontfamily,
+                fontsize=fontsize,
+                labelsize=labelsize,
+                titlesize=titlesize,
+                titlepad=titlepad,
+                facecolor=facecolor,
+                edgecolor=edgecolor,
+                linewidth=linewidth,
+                xmargin=xmargin,
+                ymargin=ymargin,
+                xtickmajorsize=xtickmajorsize,
+                ytickmajorsize=ytickmajorsize,
+                dpi=dpi,
+                rc_params_dict=rc_params_dict,
+            )
+        )
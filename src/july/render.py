@@ -0,0 +1,223 @@
+import io
+import gc
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import threading
+import weakref
+import numpy as np
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Plot kinds that can be rendered by name, mapped to the names of their
+# functions in `july.plot`.
+PLOT_KINDS = {
+    "heatmap": "heatmap",
+    "month": "month_plot",
+    "calendar": "calendar_plot",
+}
+
+# Encoding buffer of each thread, reused across renders.
+_local = threading.local()
+
+
+def _plot_function(kind: str):
+    import july.plot
+
+    if kind not in PLOT_KINDS:
+        raise ValueError(
+            f"Argument 'kind' must be one of {[*PLOT_KINDS.keys()]}. Got: {kind}."
+        )
+    return getattr(july.plot, PLOT_KINDS[kind])
+
+
+def _init_worker() -> None:
+    """Import matplotlib with a non-interactive backend once per worker."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import july.plot  # noqa: F401
+    from july.rcmod import update_rcparams
+
+    update_rcparams()
+
+
+def _buffer() -> io.BytesIO:
+    buf = getattr(_local, "buffer", None)
+    if buf is None:
+        buf = _local.buffer = io.BytesIO()
+    buf.seek(0)
+    return buf
+
+
+def _style_kwargs(kind: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # Keyword arguments that are not parameters of the plot function style it.
+    params = inspect.signature(_plot_function(kind)).parameters
+    return {key: val for key, val in kwargs.items() if key not in params}
+
+
+def _save(
+    buf: io.BytesIO,
+    kind: str,
+    format: str,
+    dpi: Optional[float],
+    kwargs: Dict[str, Any],
+) -> Tuple[int, "weakref.ref[Any]"]:
+    # Build and encode the plot into `buf`, and return the size of the image and a
+    # weak reference to the figure, which is unreferenced when this returns.
+    from july.helpers import pyplot_free
+    from july.rcmod import rc_context
+
+    plot = _plot_function(kind)
+    with pyplot_free(), rc_context(**_style_kwargs(kind, kwargs)):
+        fig = np.ravel(plot(**kwargs))[0].get_figure()
+        fig.savefig(buf, format=format, dpi=dpi)
+    return buf.tell(), weakref.ref(fig)
+
+
+def render_to_bytes(
+    kind: str = "heatmap", format: str = "png", dpi: Optional[float] = None, **kwargs
+) -> bytes:
+    """Render one plot to image bytes without pyplot, and free its figure.
+
+    The figure gets an Agg canvas of its own (see `july.helpers.pyplot_free`), so
+    it is never kept alive by pyplot, and renders in several threads share no
+    pyplot state. matplotlib reads the global rcParams while it builds and draws a
+    figure, so both run with the style of the plot applied. Renders with the same
+    style run at the same time, and renders with another style wait for them (see
+    `july.rcmod.rc_context`).
+
+    The image is encoded into a buffer that each thread reuses. Figures are full
+    of reference cycles, so the young garbage collector generations are collected
+    after each render, and all of them if that did not free the figure. The figure
+    is freed right away, and memory stays flat in long-running workers.
+
+    Args:
+        kind: One of `PLOT_KINDS`: 'heatmap', 'month' or 'calendar'.
+        format: Image format passed to `savefig`, e.g. 'png' or 'svg'.
+        dpi: Resolution passed to `savefig`. Defaults to the figure dpi.
+        kwargs: Keyword arguments for the plot function, including its style.
+    Returns:
+        Encoded image.
+    """
+    buf = _buffer()
+    figure = None
+    try:
+        size, figure = _save(buf, kind, format, dpi, kwargs)
+        with buf.getbuffer() as view:
+            return bytes(view[:size])
+    finally:
+        # Collecting the young generations frees most figures. Parts of figures
+        # that take long to build can be promoted to the oldest generation first,
+        # and those figures need a full collection.
+        gc.collect(1)
+        if figure is not None and figure() is not None:
+            gc.collect()
+
+
+async def render_async(
+    kind: str = "heatmap",
+    format: str = "png",
+    dpi: Optional[float] = None,
+    executor: Optional[Executor] = None,
+    **kwargs,
+) -> bytes:
+    """Render one plot with `render_to_bytes` in an executor, without blocking the
+    event loop.
+
+    Args:
+        kind: One of `PLOT_KINDS`: 'heatmap', 'month' or 'calendar'.
+        format: Image format passed to `savefig`.
+        dpi: Resolution passed to `savefig`. Defaults to the figure dpi.
+        executor: Executor to render in. Defaults to the default executor of the
+            running loop, a thread pool.
+        kwargs: Keyword arguments for the plot function, including its style.
+    Returns:
+        Encoded image.
+    """
+    loop = asyncio.get_running_loop()
+    render = functools.partial(
+        render_to_bytes, kind=kind, format=format, dpi=dpi, **kwargs
+    )
+    return await loop.run_in_executor(executor, render)
+
+
+def _render_job(
+    job: Dict[str, Any], format: str = "png", dpi: Optional[float] = None
+) -> bytes:
+    """Render one job with `render_to_bytes`.
+
+    Args:
+        job: Keyword arguments for the plot function, plus an optional 'kind' key
+            (one of `PLOT_KINDS`, defaults to 'heatmap').
+        format: Image format passed to `savefig`.
+        dpi: Resolution passed to `savefig`. Defaults to the figure dpi.
+    Returns:
+        Encoded image.
+    """
+    return render_to_bytes(format=format, dpi=dpi, **job)
+
+
+def _render_indexed_job(
+    indexed_job: Tuple[int, Dict[str, Any]], format: str, dpi: Optional[float]
+) -> Tuple[int, bytes]:
+    i, job = indexed_job
+    return i, _render_job(job, format=format, dpi=dpi)
+
+
+def iter_render_many(
+    jobs: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    format: str = "png",
+    dpi: Optional[float] = None,
+    maxtasksperchild: Optional[int] = 100,
+) -> Iterator[Tuple[int, bytes]]:
+    """Render many plots in a process pool, yielding them as they finish.
+
+    Args:
+        jobs: Keyword arguments for each plot, plus an optional 'kind' key: one of
+            'heatmap' (default), 'month' or 'calendar'. E.g.
+            `{"dates": dates, "data": data, "cmap": "github"}`.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        format: Image format, e.g. 'png' or 'svg'.
+        dpi: Resolution of the encoded images. Defaults to the figure dpi.
+        maxtasksperchild: Number of jobs after which a worker process is replaced,
+            to bound its memory. None keeps workers alive for all jobs.
+    Returns:
+        Iterator of (index, image bytes), where index is the position of the job
+        in `jobs`, in order of completion.
+    """
+    render = functools.partial(_render_indexed_job, format=format, dpi=dpi)
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, maxtasksperchild=maxtasksperchild
+    ) as pool:
+        yield from pool.imap_unordered(render, enumerate(jobs))
+
+
+def render_many(
+    jobs: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    format: str = "png",
+    dpi: Optional[float] = None,
+    maxtasksperchild: Optional[int] = 100,
+) -> List[bytes]:
+    """Render many plots in a process pool.
+
+    Args:
+        jobs: Keyword arguments for each plot, plus an optional 'kind' key: one of
+            'heatmap' (default), 'month' or 'calendar'. E.g.
+            `{"dates": dates, "data": data, "cmap": "github"}`.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        format: Image format, e.g. 'png' or 'svg'.
+        dpi: Resolution of the encoded images. Defaults to the figure dpi.
+        maxtasksperchild: Number of jobs after which a worker process is replaced,
+            to bound its memory. None keeps workers alive for all jobs.
+    Returns:
+        List of image bytes, in the same order as `jobs`.
+    """
+    render = functools.partial(_render_job, format=format, dpi=dpi)
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, maxtasksperchild=maxtasksperchild
+    ) as pool:
+        return pool.map(render, jobs, chunksize=1)
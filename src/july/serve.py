@@ -0,0 +1,367 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+import numpy as np
+import july
+from july.utils import preprocess_inputs
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+
+def _json_default(obj: Any) -> Any:
+    # NumPy scalars and arrays in the options of requests made from Python.
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class RenderCache:
+    """Cache of rendered images by key, in memory and optionally on disk.
+
+    Both levels evict the least recently used images once their total size exceeds
+    the limit. Images evicted from memory stay on disk.
+
+    Args:
+        max_memory_bytes: Maximum total size of the images kept in memory.
+        directory: Directory to keep images in on disk. None disables the disk
+            cache.
+        max_disk_bytes: Maximum total size of the images kept on disk.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 2**20,
+        directory: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 1024 * 2**20,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = None if directory is None else Path(directory)
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_bytes = sum(f.stat().st_size for f in self.directory.iterdir())
+
+    def get(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Get an image and where it was found: 'memory', 'disk', or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key], "memory"
+        if self.directory is None:
+            return None, None
+        path = self.directory / key
+        try:
+            image = path.read_bytes()
+            # Mark as recently used for the disk eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            return None, None
+        self._put_memory(key, image)
+        return image, "disk"
+
+    def put(self, key: str, image: bytes) -> None:
+        """Add an image to the cache."""
+        self._put_memory(key, image)
+        if self.directory is not None:
+            self._put_disk(key, image)
+
+    def _put_memory(self, key: str, image: bytes) -> None:
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = image
+            self.memory_bytes += len(image)
+            while self.memory_bytes > self.max_memory_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self.memory_bytes -= len(evicted)
+                self.evictions += 1
+
+    def _put_disk(self, key: str, image: bytes) -> None:
+        assert self.directory is not None
+        path = self.directory / key
+        if path.exists():
+            return
+        # Write to a temporary file first, so readers never see partial images.
+        tmp_path = self.directory / f".{key}.{threading.get_ident()}.tmp"
+        tmp_path.write_bytes(image)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.disk_bytes += len(image)
+            if self.disk_bytes <= self.max_disk_bytes:
+                return
+            files = sorted(
+                (f for f in self.directory.iterdir() if not f.name.startswith(".")),
+                key=lambda f: f.stat().st_mtime,
+            )
+            for f in files:
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+                size = f.stat().st_size
+                f.unlink(missing_ok=True)
+                self.disk_bytes -= size
+                self.evictions += 1
+
+
+class RenderService:
+    """Render plots by request, with caching and deduplication of identical
+    requests.
+
+    Requests hold the keyword arguments of `heatmap`, `month_plot` or
+    `calendar_plot`, plus optional keys 'kind' ('heatmap' (default), 'month' or
+    'calendar'), 'format' (default 'png') and 'dpi'. Requests are identified by a
+    sha256 hash of their preprocessed dates and data and their other arguments, so
+    equivalent requests share one rendering.
+
+    Args:
+        cache: Cache of rendered images. Defaults to an in-memory RenderCache.
+    """
+
+    def __init__(self, cache: Optional[RenderCache] = None):
+        self.cache = cache or RenderCache()
+        self.counts = {
+            "requests": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "inflight_hits": 0,
+            "misses": 0,
+            "errors": 0,
+        }
+        self.render_seconds = 0.0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def normalize(self, request: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Get the cache key and the render job of a request.
+
+        Returns:
+            key: sha256 hex digest of the normalized request.
+            job: Keyword arguments for `july.render._render_job`.
+        """
+        job = dict(request)
+        kind = job.pop("kind", "heatmap")
+        format = job.pop("format", "png")
+        dpi = job.pop("dpi", None)
+        if format not in CONTENT_TYPES:
+            raise ValueError(
+                f"Argument 'format' must be one of {[*CONTENT_TYPES]}. Got: {format}."
+            )
+        dates, data = preprocess_inputs(job.pop("dates"), job.pop("data", None))
+        data = data.astype(float)
+
+        h = hashlib.sha256()
+        params = {"kind": kind, "format": format, "dpi": dpi, "options": job}
+        h.update(
+            json.dumps(
+                [july.__version__, params], sort_keys=True, default=_json_default
+            ).encode()
+        )
+        # Preprocessed dates are contiguous, so the first date and the length of
+        # the data define them.
+        h.update(dates[:1].astype(np.int64).tobytes())
+        h.update(data.tobytes())
+        h.update(np.ma.getmaskarray(data).tobytes())
+        job.update(kind=kind, dates=dates, data=data)
+        return h.hexdigest(), {"job": job, "format": format, "dpi": dpi}
+
+    def render(self, request: Dict[str, Any]) -> Tuple[str, bytes, str]:
+        """Render a request, or get it from the cache.
+
+        Returns:
+            key: Cache key of the request.
+            image: Encoded image.
+            source: 'memory', 'disk', 'inflight' (waited for an identical request)
+                or 'miss' (rendered).
+        """
+        with self._lock:
+            self.counts["requests"] += 1
+        try:
+            key, render_args = self.normalize(request)
+        except Exception:
+            self._count("errors")
+            raise
+
+        image, source = self.cache.get(key)
+        if image is not None and source is not None:
+            self._count(f"{source}_hits")
+            return key, image, source
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        assert future is not None
+        if not owner:
+            self._count("inflight_hits")
+            return key, future.result(), "inflight"
+
+        try:
+            image = self._render(**render_args)
+            self.cache.put(key, image)
+            future.set_result(image)
+        except Exception as err:
+            self._count("errors")
+            future.set_exception(err)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        self._count("misses")
+        return key, image, "miss"
+
+    def _render(self, job: Dict[str, Any], format: str, dpi: Optional[float]) -> bytes:
+        from july.rcmod import rc_context
+        from july.render import _render_job, _style_kwargs
+
+        # Wait for the style lock before the clock starts, so that render_seconds
+        # counts rendering only.
+        options = {key: val for key, val in job.items() if key != "kind"}
+        with rc_context(**_style_kwargs(job.get("kind", "heatmap"), options)):
+            start = time.perf_counter()
+            image = _render_job(job, format=format, dpi=dpi)
+            elapsed = time.perf_counter() - start
+        with self._lock:
+            self.render_seconds += elapsed
+        return image
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get request counts, cache hit rate and cache sizes."""
+        with self._lock:
+            counts = dict(self.counts)
+        hits = counts["memory_hits"] + counts["disk_hits"] + counts["inflight_hits"]
+        return {
+            **counts,
+            "hit_rate": hits / max(hits + counts["misses"], 1),
+            "render_seconds": self.render_seconds,
+            "memory_bytes": self.cache.memory_bytes,
+            "disk_bytes": self.cache.disk_bytes,
+            "evictions": self.cache.evictions,
+        }
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Handle `POST /render` with a JSON request, and `GET /metrics`."""
+
+    server: "RenderServer"
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            key, image, source = self.server.service.render(request)
+        except (ValueError, TypeError, KeyError) as err:
+            self._send_json(400, {"error": f"{type(err).__name__}: {err}"})
+            return
+        except Exception as err:
+            self._send_json(500, {"error": f"{type(err).__name__}: {err}"})
+            return
+
+        format = request.get("format", "png")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[format])
+        self.send_header("Content-Length", str(len(image)))
+        self.send_header("ETag", f'"{key}"')
+        self.send_header("X-Cache", source)
+        self.end_headers()
+        self.wfile.write(image)
+
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        self._send_json(200, self.server.service.metrics())
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class RenderServer(ThreadingHTTPServer):
+    """HTTP server for a RenderService. See `serve`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: Tuple[str, int], service: Optional[RenderService] = None
+    ):
+        super().__init__(address, RenderRequestHandler)
+        self.service = service or RenderService()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    cache_dir: Optional[Union[str, Path]] = None,
+    max_memory_bytes: int = 64 * 2**20,
+    max_disk_bytes: int = 1024 * 2**20,
+) -> None:
+    """Serve plots over HTTP until interrupted.
+
+    `POST /render` takes a JSON request (see `RenderService`) and responds with
+    the image. The `X-Cache` header tells whether it came from the cache.
+    `GET /metrics` responds with request counts and cache statistics as JSON.
+
+    Args:
+        host: Host to listen on.
+        port: Port to listen on.
+        cache_dir: Directory for the disk cache. None disables the disk cache.
+        max_memory_bytes: Maximum total size of the images cached in memory.
+        max_disk_bytes: Maximum total size of the images cached on disk.
+    """
+    cache = RenderCache(max_memory_bytes, cache_dir, max_disk_bytes)
+    with RenderServer((host, port), RenderService(cache)) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve july plots over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--max-memory-mb", type=float, default=64)
+    parser.add_argument("--max-disk-mb", type=float, default=1024)
+    args = parser.parse_args()
+    serve(
+        args.host,
+        args.port,
+        args.cache_dir,
+        int(args.max_memory_mb * 2**20),
+        int(args.max_disk_mb * 2**20),
+    )
+
+
+if __name__ == "__main__":
+    main()
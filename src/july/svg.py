@@ -0,0 +1,484 @@
+import calendar
+import datetime
+import functools
+import html
+import zlib
+import numpy as np
+from typing import Any, Iterable, List, Optional, Tuple, Union
+from july.colormaps import colormap_lut
+from july.utils import (
+    QUANTIZED_LEVELS,
+    QUANTIZED_MISSING,
+    check_cell_labels,
+    color_limits,
+    date_grid,
+    date_parts,
+    fill_masked,
+    format_cells,
+    get_month_outline,
+    period_locs,
+    preprocess_inputs,
+    to_datetime64,
+    value_label_format,
+)
+
+# Space around the figure, and between the grid and its labels, in pixels.
+_PAD = 4
+
+
+def heatmap_svg(
+    dates: Union[List[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[List[float], np.ndarray]] = None,
+    horizontal: bool = True,
+    cmap: Union[str, Any] = "july",
+    value_label: bool = False,
+    date_label: bool = False,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    month_grid: bool = False,
+    month_grid_color: str = "black",
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[float] = None,
+    cmax: Optional[float] = None,
+    cbar_label_format: Optional[str] = None,
+    cell_size: int = 12,
+    fontsize: float = 12,
+    fontfamily: str = "monospace",
+    format: str = "svg",
+    fill_missing: Optional[float] = 0,
+) -> str:
+    """Create heatmap of input dates and data as an SVG (or HTML) string.
+
+    Same heatmap as `heatmap`, written directly as markup without matplotlib.
+
+    Args:
+        dates: List like data structure with dates, or a pandas Series indexed by
+            date if `data` is None.
+        data: List like data structure with numeric data.
+        horizontal: Whether to plot heatmap horizontally. Grid shape (7, n_weeks)
+            if True, (n_weeks, 7) if False.
+        cmap: Name of a colormap in `july.colormaps.cmaps_dict`, or a matplotlib
+            Colormap.
+        value_label: Whether to add value label inside grid.
+        date_label: Whether to add date label inside grid.
+        weekday_label: Whether to label the short axis with weekday abbreviations.
+        month_label: Whether to add month label(s) along the long axis.
+        year_label: Whether to add year label(s) along the long axis.
+        month_grid: Whether to outline each month in the grid.
+        month_grid_color: Color to use for month grid outline.
+        colorbar: Whether to add colorbar.
+        frame_on: Whether to draw a frame around the grid.
+        value_format: Format of value_label: 'int' or 'decimal'. Only relevant if
+            `value_label` is True.
+        title: Title of the plot.
+        cmin: Minimum value of the colorbar. Defaults to minimum value of `data`.
+        cmax: Maximum value of the colorbar. Defaults to maximum value of 'data'.
+        cbar_label_format: Format string for colorbar labels, e.g. '%.1f' or
+            '{x:.1f}'.
+        cell_size: Size of each cell in pixels, including the gap between cells.
+        fontsize: Font size in pixels.
+        fontfamily: Font family.
+        format: Output format: 'svg' for an SVG document, or 'html' for an HTML
+            document with the SVG inline.
+        fill_missing: Value of the days missing from `dates` within its range.
+            None leaves them empty, like the days outside the range.
+    Returns:
+        SVG or HTML string.
+    """
+    dates_clean, data_clean = preprocess_inputs(dates, data)
+    cal = date_grid(dates_clean, fill_masked(data_clean, fill_missing), horizontal)
+    return cal_heatmap_svg(
+        cal=cal,
+        dates=dates_clean,
+        horizontal=horizontal,
+        cmap=cmap,
+        value_label=value_label,
+        date_label=date_label,
+        weekday_label=weekday_label,
+        month_label=month_label,
+        year_label=year_label,
+        month_grid=month_grid,
+        month_grid_color=month_grid_color,
+        colorbar=colorbar,
+        frame_on=frame_on,
+        value_format=value_format,
+        title=title,
+        cmin=cmin,
+        cmax=cmax,
+        cbar_label_format=cbar_label_format,
+        cell_size=cell_size,
+        fontsize=fontsize,
+        fontfamily=fontfamily,
+        format=format,
+    )
+
+
+def cal_heatmap_svg(
+    cal: np.ndarray,
+    dates: Union[List[datetime.date], np.ndarray],
+    horizontal: bool,
+    cmap: Union[str, Any] = "Greens",
+    value_label: bool = False,
+    date_label: bool = False,
+    weekday_label: bool = True,
+    month_label: bool = True,
+    year_label: bool = True,
+    month_grid: bool = False,
+    month_grid_color: str = "black",
+    colorbar: bool = False,
+    frame_on: bool = False,
+    value_format: str = "int",
+    title: Optional[str] = None,
+    cmin: Optional[float] = None,
+    cmax: Optional[float] = None,
+    cbar_label_format: Optional[str] = None,
+    cell_size: int = 12,
+    fontsize: float = 12,
+    fontfamily: str = "monospace",
+    format: str = "svg",
+) -> str:
+    """Write a grid from `date_grid` as an SVG (or HTML) string, like `cal_heatmap`.
+
+    See `heatmap_svg` for the arguments.
+    """
+    check_cell_labels(value_label, date_label)
+    if format not in ["svg", "html"]:
+        raise ValueError(f"Argument 'format' must be 'svg' or 'html'. Got: {format}.")
+
+    dates = to_datetime64(dates)
+    n_rows, n_cols = np.shape(cal)
+    size = cell_size
+    gap = max(1, size // 8)
+    line = round(fontsize * 1.5)
+
+    # Margins around the grid, for the labels on each side.
+    top = left = bottom = right = _PAD
+    if title:
+        top += round(fontsize * 2)
+    if horizontal:
+        left += weekday_label * line
+        top += year_label * line
+        bottom += month_label * line
+    else:
+        top += weekday_label * line
+        left += (month_label + year_label) * line
+    grid_width, grid_height = n_cols * size, n_rows * size
+
+    vmin, vmax = color_limits(cal, cmin, cmax)
+    body = [_cells_svg(cal, cmap, vmin, vmax, size, gap)]
+    if value_label and cal.dtype == np.uint8:
+        raise ValueError("Value labels need the values, not a quantized grid.")
+    if value_label:
+        body.append(
+            _cell_labels_svg(
+                format_cells(cal, value_label_format(value_format)), size, gap
+            )
+        )
+    if date_label:
+        days = date_grid(dates, date_parts(dates)[2], horizontal)
+        body.append(_cell_labels_svg(format_cells(days, "%d"), size, gap))
+    if weekday_label:
+        body.append(_weekday_labels_svg(horizontal, size, gap))
+    if month_label:
+        body.append(_month_labels_svg(dates, horizontal, size, gap, grid_height))
+    if year_label:
+        body.append(_year_labels_svg(dates, horizontal, size, gap, line, fontsize))
+    if month_grid:
+        body.append(_month_grid_svg(dates, horizontal, size, gap, month_grid_color))
+    if frame_on:
+        body.append(
+            f'<rect x="{-gap / 2:g}" y="{-gap / 2:g}" width="{grid_width}" '
+            f'height="{grid_height}" fill="none" stroke="black"/>'
+        )
+    if colorbar:
+        cbar, cbar_width = _colorbar_svg(
+            cmap, vmin, vmax, grid_height, size, gap, fontsize, cbar_label_format
+        )
+        body.append(f'<g transform="translate({grid_width + size},0)">{cbar}</g>')
+        right += size + cbar_width
+
+    width = left + grid_width + right
+    height = top + grid_height + bottom
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="{html.escape(fontfamily)}" '
+        f'font-size="{fontsize:g}">'
+    ]
+    if title:
+        parts.append(
+            f'<text x="{width / 2:g}" y="{_PAD + fontsize * 1.2:g}" '
+            f'text-anchor="middle" font-size="{fontsize * 1.2:g}">'
+            f"{html.escape(title)}</text>"
+        )
+    parts.append(f'<g transform="translate({left},{top})">')
+    parts.extend(body)
+    parts.append("</g></svg>")
+    svg = "".join(parts)
+
+    if format == "html":
+        page_title = html.escape(title or "July heatmap")
+        return f'<!DOCTYPE html><meta charset="utf-8"><title>{page_title}</title>{svg}'
+    return svg
+
+
+@functools.lru_cache(maxsize=64)
+def _named_hex_lut(cmap: str) -> List[str]:
+    return _hex_lut(colormap_lut(cmap))
+
+
+def _hex_lut(lut: np.ndarray) -> List[str]:
+    rgba = np.round(np.asarray(lut) * 255).astype(int).tolist()
+    return [
+        (
+            "#%02x%02x%02x" % tuple(c[:3])
+            if c[3] == 255
+            else "#%02x%02x%02x%02x" % tuple(c)
+        )
+        for c in rgba
+    ]
+
+
+def _colors(cmap: Union[str, Any]) -> List[str]:
+    return (
+        _named_hex_lut(cmap) if isinstance(cmap, str) else _hex_lut(colormap_lut(cmap))
+    )
+
+
+def _color_index(values: np.ndarray, vmin: float, vmax: float, n: int) -> np.ndarray:
+    # Same mapping as matplotlib's Normalize followed by Colormap.__call__.
+    if vmax > vmin:
+        scaled = (values - vmin) / (vmax - vmin) * n
+    else:
+        scaled = np.zeros_like(values)
+    return np.clip(np.floor(scaled), 0, n - 1).astype(int)
+
+
+def _cells_svg(
+    cal: np.ndarray,
+    cmap: Union[str, Any],
+    vmin: float,
+    vmax: float,
+    size: int,
+    gap: int,
+) -> str:
+    # One path per color, with a square subpath per cell. Cells without a finite
+    # value are left out.
+    colors = _colors(cmap)
+    if cal.dtype == np.uint8:
+        # Quantized grid: the color at the centre of each bin.
+        rows, cols = np.nonzero(cal != QUANTIZED_MISSING)
+        color_idx = _color_index(
+            cal[rows, cols] + 0.5, 0, QUANTIZED_LEVELS, len(colors)
+        )
+    else:
+        rows, cols = np.nonzero(np.isfinite(cal))
+        color_idx = _color_index(cal[rows, cols], vmin, vmax, len(colors))
+    order = np.argsort(color_idx, kind="stable")
+    color_idx = color_idx[order]
+
+    # Concatenate the coordinates of each column and row, formatted once.
+    w = size - gap
+    col_strs = [f"M{col * size} " for col in range(cal.shape[1])]
+    row_strs = [f"{row * size}h{w}v{w}h-{w}z" for row in range(cal.shape[0])]
+    squares = [
+        col_strs[col] + row_strs[row]
+        for col, row in zip(cols[order].tolist(), rows[order].tolist())
+    ]
+    used, starts = np.unique(color_idx, return_index=True)
+    ends = [*starts[1:].tolist(), len(squares)]
+    return "".join(
+        f'<path fill="{colors[i]}" d="{"".join(squares[start:end])}"/>'
+        for i, start, end in zip(used.tolist(), starts.tolist(), ends)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _weekday_names() -> List[str]:
+    return calendar.weekheader(width=1).split(" ")
+
+
+@functools.lru_cache(maxsize=None)
+def _month_names() -> List[str]:
+    return list(calendar.month_abbr)
+
+
+def _group(attrs: str, elements: Iterable[str]) -> str:
+    return f"<g {attrs}>{''.join(elements)}</g>"
+
+
+def _cell_labels_svg(labels: np.ndarray, size: int, gap: int) -> str:
+    rows, cols = np.nonzero(labels != "")
+    texts = labels[rows, cols].tolist()
+    center = (size - gap) / 2
+    xs = (cols * size + center).tolist()
+    ys = (rows * size + center).tolist()
+    return _group(
+        'text-anchor="middle" dominant-baseline="central" '
+        f'font-size="{size * 0.45:g}"',
+        (
+            f'<text x="{x:g}" y="{y:g}">{html.escape(t)}</text>'
+            for x, y, t in zip(xs, ys, texts)
+        ),
+    )
+
+
+def _weekday_labels_svg(horizontal: bool, size: int, gap: int) -> str:
+    weekdays = _weekday_names()
+    centers = [i * size + (size - gap) / 2 for i in range(7)]
+    if horizontal:
+        return _group(
+            'text-anchor="end" dominant-baseline="central"',
+            (
+                f'<text x="{-_PAD * 2}" y="{y:g}">{day}</text>'
+                for y, day in zip(centers, weekdays)
+            ),
+        )
+    return _group(
+        'text-anchor="middle"',
+        (
+            f'<text x="{x:g}" y="{-_PAD * 2}">{day}</text>'
+            for x, day in zip(centers, weekdays)
+        ),
+    )
+
+
+def _month_labels_svg(
+    dates: np.ndarray, horizontal: bool, size: int, gap: int, grid_height: int
+) -> str:
+    months, locs, _ = period_locs(dates, "M")
+    month_names = _month_names()
+    labels = [month_names[x % 12 + 1] for x in months.tolist()]
+    centers = (locs * size - gap / 2).tolist()
+    if horizontal:
+        return _group(
+            'text-anchor="middle" dominant-baseline="hanging"',
+            (
+                f'<text x="{x:g}" y="{grid_height + _PAD}">{label}</text>'
+                for x, label in zip(centers, labels)
+            ),
+        )
+    return _group(
+        'text-anchor="middle"',
+        (
+            f'<text transform="translate({-_PAD * 2},{y:g}) rotate(-90)">{label}</text>'
+            for y, label in zip(centers, labels)
+        ),
+    )
+
+
+def _year_labels_svg(
+    dates: np.ndarray,
+    horizontal: bool,
+    size: int,
+    gap: int,
+    line: int,
+    fontsize: float,
+) -> str:
+    years, locs, _ = period_locs(dates, "Y")
+    centers = (locs * size - gap / 2).tolist()
+    years = (years + 1970).tolist()
+    attrs = f'text-anchor="middle" font-size="{fontsize * 1.2:g}"'
+    if horizontal:
+        return _group(
+            attrs,
+            (
+                f'<text x="{x:g}" y="{-_PAD * 2}">{year}</text>'
+                for x, year in zip(centers, years)
+            ),
+        )
+    return _group(
+        attrs,
+        (
+            f'<text transform="translate({-_PAD * 2 - line},{y:g}) rotate(-90)">'
+            f"{year}</text>"
+            for y, year in zip(centers, years)
+        ),
+    )
+
+
+def _month_grid_svg(
+    dates: np.ndarray, horizontal: bool, size: int, gap: int, color: str
+) -> str:
+    # Month edges run along the middle of the gaps between cells.
+    segments = get_month_outline(dates, horizontal) * size - gap / 2
+    path = "".join(
+        f"M{x0:g} {y0:g}L{x1:g} {y1:g}" for (x0, y0), (x1, y1) in segments.tolist()
+    )
+    return (
+        f'<path d="{path}" fill="none" stroke="{html.escape(color)}" '
+        'stroke-linecap="square"/>'
+    )
+
+
+def _format_tick(value: float, fmt: Optional[str]) -> str:
+    if fmt is None:
+        return f"{value:g}"
+    if "{" in fmt:
+        return fmt.format(x=value, pos=None)
+    return fmt % value
+
+
+def _ticks(vmin: float, vmax: float, n: int = 5) -> np.ndarray:
+    # Round ticks, like matplotlib's default locator.
+    if not vmax > vmin:
+        return np.array([vmin])
+    raw = (vmax - vmin) / n
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in [1, 2, 2.5, 5, 10] if m * magnitude >= raw)
+    ticks = np.arange(np.ceil(vmin / step) * step, vmax + step * 1e-9, step)
+    # Avoid labels like '-0'.
+    return ticks + 0.0
+
+
+def _colorbar_svg(
+    cmap: Union[str, Any],
+    vmin: float,
+    vmax: float,
+    grid_height: int,
+    size: int,
+    gap: int,
+    fontsize: float,
+    cbar_label_format: Optional[str],
+) -> Tuple[str, int]:
+    colors = _colors(cmap)
+    n = len(colors)
+    if n <= 32:
+        # Listed colormap: a hard step per color.
+        stops = [
+            (offset, color)
+            for i, color in enumerate(colors)
+            for offset in [i / n, (i + 1) / n]
+        ]
+    else:
+        stops = [(i / 16, colors[min(i * n // 16, n - 1)]) for i in range(17)]
+    stops_svg = "".join(
+        f'<stop offset="{offset:g}" stop-color="{color}"/>' for offset, color in stops
+    )
+    # Deterministic id, so identical figures give identical output.
+    gradient_id = f"july-cbar-{zlib.crc32(stops_svg.encode()):08x}"
+
+    bar_height = grid_height - gap
+    labels = [
+        (bar_height * (1 - (tick - vmin) / (vmax - vmin)) if vmax > vmin else 0, tick)
+        for tick in _ticks(vmin, vmax).tolist()
+    ]
+    texts = [_format_tick(tick, cbar_label_format) for _, tick in labels]
+    svg = (
+        f'<defs><linearGradient id="{gradient_id}" x1="0" y1="1" x2="0" y2="0">'
+        f"{stops_svg}</linearGradient></defs>"
+        f'<rect width="{size}" height="{bar_height}" fill="url(#{gradient_id})"/>'
+    )
+    svg += _group(
+        'dominant-baseline="central"',
+        (
+            f'<text x="{size + _PAD}" y="{y:g}">{html.escape(text)}</text>'
+            for (y, _), text in zip(labels, texts)
+        ),
+    )
+    # Width of the colorbar and its labels, at about 0.6 em per character.
+    label_width = round(max(len(text) for text in texts) * fontsize * 0.6)
+    return svg, size + _PAD + label_width
@@ -1,9 +1,15 @@
-import calendar
 import datetime
+import warnings
 import numpy as np
 from datetime import datetime as dt
 from datetime import timedelta
-from typing import Union, List, Any, Tuple, Optional
+from typing import Union, List, Any, Tuple, Optional, Sequence
+from july.profiling import instrument
+
+# Quantized grids hold colormap bin indices 0 to QUANTIZED_LEVELS - 1 as uint8,
+# with QUANTIZED_MISSING for cells without a value.
+QUANTIZED_LEVELS = 255
+QUANTIZED_MISSING = 255
 
 
 def date_converter(date: Union[str, datetime.date, datetime.datetime]) -> datetime.date:
@@ -51,46 +57,234 @@ def date_range(
     return [start_date + timedelta(days=x) for x in range(0, rng_diff.days + 1)]
 
 
+def _is_arrow(values: Any) -> bool:
+    return type(values).__module__.startswith("pyarrow")
+
+
+def _native_values(values: Any) -> Any:
+    """Unwrap pandas and Arrow containers to an array, reading their buffers."""
+    if _is_arrow(values):
+        if getattr(values.type, "tz", None) is not None:
+            import pyarrow.compute as pc  # type: ignore
+
+            # Local wall time, like the dates of timezone-aware pandas data.
+            values = pc.local_timestamp(values)
+        return values.to_numpy(zero_copy_only=False)
+    if getattr(values.dtype, "tz", None) is not None:
+        # Timezone-aware pandas data, e.g. Series or DatetimeIndex.
+        values = getattr(values, "dt", values).tz_localize(None)
+    return values.to_numpy()
+
+
+@instrument
+def to_datetime64(
+    dates: Union[Sequence[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+) -> np.ndarray:
+    """Convert input dates to a NumPy array of dtype datetime64[D].
+
+    Arrays of dtype datetime64, YYYY-MM-DD strings and naive date objects are
+    converted in bulk. pandas (Series, DatetimeIndex) and Arrow (Array, ChunkedArray)
+    dates are read from their underlying buffers; timezone-aware dates keep their
+    local date. Anything else falls back to `date_converter`, element by element.
+
+    Args:
+        dates: List (/np.array/pd.Series/pd.DatetimeIndex/pa.Array) of dates.
+    Returns:
+        Array of dates with dtype datetime64[D].
+    """
+    if hasattr(dates, "to_numpy"):
+        dates = _native_values(dates)
+    arr = np.asarray(dates)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[D]")
+    try:
+        if arr.dtype.kind in "US" and np.all(np.char.str_len(arr) == 10):
+            # Only full YYYY-MM-DD strings parse to days; others, like "2020-01",
+            # are left to `date_converter`.
+            parsed = arr.astype("datetime64")
+            if parsed.dtype == np.dtype("datetime64[D]"):
+                return parsed
+        if arr.dtype.kind == "O" and all(map(_is_naive_date, arr.flat)):
+            return arr.astype("datetime64[D]")
+    except (ValueError, TypeError):
+        pass
+    return np.array([date_converter(date) for date in dates], dtype="datetime64[D]")
+
+
+def _is_naive_date(date: Any) -> bool:
+    # NumPy converts timezone-aware datetimes to UTC, which can change the day.
+    return isinstance(date, datetime.date) and getattr(date, "tzinfo", None) is None
+
+
+def to_values(data: Union[Sequence[Any], np.ndarray]) -> np.ndarray:
+    """Convert input data to a NumPy array.
+
+    NumPy backed pandas data is returned without a copy. Nullable pandas and Arrow
+    data are read from their buffers into a float array, with NaN for missing
+    values. Masked arrays are returned as is, with masked values taken as missing.
+
+    Args:
+        data: List (/np.array/pd.Series/pa.Array) of numeric values.
+    Returns:
+        Array of the values.
+    """
+    if isinstance(data, np.ma.MaskedArray):
+        return data
+    if _is_arrow(data) and hasattr(data, "to_numpy"):
+        return data.to_numpy(zero_copy_only=False)
+    dtype = getattr(data, "dtype", None)
+    if dtype is not None and not isinstance(dtype, np.dtype):
+        # pandas extension dtype, e.g. Int64 or Float64 with pd.NA.
+        return data.to_numpy(dtype=float, na_value=np.nan)  # type: ignore
+    return np.asarray(data)
+
+
+def split_series(
+    dates: Any, data: Optional[Union[Sequence[Any], np.ndarray]] = None
+) -> Tuple[Any, Any]:
+    """Get dates and data from a pandas Series indexed by date, if no data is given.
+
+    Args:
+        dates: List like data structure with dates, or a Series indexed by date.
+        data: List like data structure with numeric data, or None.
+    Returns:
+        dates, data: The index and the Series `dates` if `data` is None and `dates`
+            has an index, else the input dates and data.
+    """
+    index = getattr(dates, "index", None)
+    if data is None and index is not None and not callable(index):
+        return index, dates
+    return dates, data
+
+
+def fill_masked(
+    data: Union[np.ndarray, np.ma.MaskedArray], fill_value: Optional[float]
+) -> np.ndarray:
+    """Get a plain array with the masked (missing) values of `data` replaced.
+
+    Args:
+        data: Array, masked or not.
+        fill_value: Value to replace masked values with. None replaces them with
+            NaN, which is drawn as an empty cell.
+    Returns:
+        Array without mask. `data` itself, or its data, if nothing is masked.
+    """
+    if not np.ma.is_masked(data):
+        return np.ma.getdata(data)
+    if fill_value is None:
+        return np.ma.filled(data.astype(float), np.nan)
+    return np.ma.filled(data, fill_value)
+
+
+def date_parts(
+    dates: Union[Sequence[datetime.date], np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split dates into year, month and day of month.
+
+    Args:
+        dates: Array (/list) of dates.
+    Returns:
+        years: Integer array of years.
+        months: Integer array of months (1-12).
+        days: Integer array of days of month (1-31).
+    """
+    dates = to_datetime64(dates)
+    months_since_epoch = dates.astype("datetime64[M]")
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    months = months_since_epoch.astype(int) % 12 + 1
+    days = (dates - months_since_epoch).astype(int) + 1
+    return years, months, days
+
+
+def iso_weeks(dates: Union[Sequence[datetime.date], np.ndarray]) -> np.ndarray:
+    """Get the ISO week number of each date.
+
+    Args:
+        dates: Array (/list) of dates.
+    Returns:
+        Integer array of ISO week numbers (1-53).
+    """
+    dates = to_datetime64(dates)
+    weekdays = (dates.astype(np.int64) + 3) % 7
+    # The ISO year of a week is the calendar year of its Thursday.
+    thursdays = dates - weekdays + 3
+    iso_year_start = thursdays.astype("datetime64[Y]").astype("datetime64[D]")
+    return (thursdays - iso_year_start).astype(np.int64) // 7 + 1
+
+
+@instrument
 def preprocess_inputs(
-    dates: List[Union[str, datetime.date, datetime.datetime]], data: List[Any]
-) -> Tuple[List[datetime.date], List[Any]]:
+    dates: Union[Sequence[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[Sequence[Any], np.ndarray]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
     """Preprocess input dates and input data. Incomplete date range in 'dates'
-    will be filled in with missing dates. The corresponding elements in 'data' will
-    be filled in with zeros.
+    will be filled in with missing dates. The corresponding elements in 'data' are
+    masked, with zeros underneath. If a date occurs more than once, the last value
+    wins.
 
     Args:
-        dates: List (/np.array/pd.Series) of dates.
-        data: List of corresponding values.
+        dates: List (/np.array/pd.Series/pd.DatetimeIndex/pa.Array) of dates, or a
+            pd.Series indexed by date if `data` is None.
+        data: List of corresponding values. Masked values are taken as missing.
     Returns:
-        dates_preprocessed: Sorted and completed list of dates in input `dates`.
-        data_preprocessed: Data sorted according to input dates.
-    """
-    # Convert all dates to datetime.date.
-    dates = [date_converter(date) for date in dates]
-    # Sort date and value pairs by date.
-    sorted_by_date = sorted([*zip(dates, data)], key=lambda x: x[0])
-    # Crate dict mapping date to value.
-    data_dict = dict(sorted_by_date)
-    # Fill in date range if not complete.
-    dates_preprocessed = date_range(
-        list(data_dict.keys())[0], list(data_dict.keys())[-1]
-    )  # type: List[datetime.date]
-    # Fill in zero for missing values for the added dates.
-    data_preprocessed = [data_dict.get(date, 0) for date in dates_preprocessed]
+        dates_preprocessed: Sorted and complete datetime64[D] array of the dates in
+            input `dates`.
+        data_preprocessed: Masked data array sorted according to input dates,
+            masked where the date was missing. See `fill_masked`.
+    """
+    dates, data = split_series(dates, data)
+    if data is None:
+        raise ValueError(
+            "Argument 'data' can only be omitted if 'dates' is a Series indexed by "
+            f"date. Got: {type(dates).__name__}."
+        )
+    dates_arr = to_datetime64(dates)
+    data_arr = to_values(data)
+    if len(dates_arr) != len(data_arr):
+        raise ValueError(
+            "Expected 'dates' and 'data' to have the same length. "
+            f"Got: {len(dates_arr)} and {len(data_arr)}."
+        )
+    steps = np.diff(dates_arr.astype(np.int64))
+    if np.all(steps == 1):
+        # Already sorted and complete, e.g. a daily index.
+        return dates_arr, np.ma.asarray(data_arr)
+
+    if np.all(steps > 0):
+        dates_unique, data_unique = dates_arr, data_arr
+    else:
+        # Stable sort by date, so the last of any duplicate dates ends up last.
+        order = np.argsort(dates_arr, kind="stable")
+        dates_sorted = dates_arr[order]
+        # Keep the last occurrence of each date.
+        keep = np.append(dates_sorted[1:] != dates_sorted[:-1], True)
+        dates_unique = dates_sorted[keep]
+        data_unique = data_arr[order][keep]
+
+    # Fill in date range if not complete, with masked zeros for the added dates.
+    offsets = (dates_unique - dates_unique[0]).astype(int)
+    dates_preprocessed = dates_unique[0] + np.arange(offsets[-1] + 1)
+    data_preprocessed = _masked_zeros(len(dates_preprocessed), data_unique.dtype)
+    data_preprocessed[offsets] = data_unique
 
     return dates_preprocessed, data_preprocessed
 
 
+def _masked_zeros(n: int, dtype: Any) -> np.ma.MaskedArray:
+    return np.ma.MaskedArray(np.zeros(n, dtype=dtype), mask=np.ones(n, dtype=bool))
+
+
 def preprocess_month(
-    dates: List[Union[str, datetime.date, datetime.datetime]],
-    data: List[Any],
+    dates: Union[Sequence[Union[str, datetime.date, datetime.datetime]], np.ndarray],
+    data: Optional[Union[Sequence[Any], np.ndarray]] = None,
     month: Optional[int] = None,
     year: Optional[int] = None,
-) -> Tuple[List[datetime.date], List[Any]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """Extract and preprocess one month of data from input dates and data.
 
     Args:
-        dates: List (/np.array/pd.Series) of dates.
+        dates: List (/np.array/pd.Series) of dates, or a pd.Series indexed by date
+            if `data` is None.
         data: List of corresponding values.
         month: Which month in the input dates to preprocess. Defaults to the
             month of the first element in dates.
@@ -105,22 +299,16 @@ def preprocess_month(
     """
     # Preprocess inputs.
     dates_clean, data_clean = preprocess_inputs(dates, data)
-    # Sort dates and values by date.
-    sorted_by_date = sorted([*zip(dates_clean, data_clean)], key=lambda x: x[0])
+    years, months, _ = date_parts(dates_clean)
     # Set month for filtering.
-    month = month or dates_clean[0].month
-    # Filter relevant month and create dict mapping date to value.
+    month = month or months[0]
+    # Filter relevant month.
+    in_month = months == month
     if year:
-        data_dict = {
-            day: val
-            for day, val in sorted_by_date
-            if day.month == month and day.year == year
-        }
-    else:
-        data_dict = {day: val for day, val in sorted_by_date if day.month == month}
+        in_month &= years == year
 
-    unique_years = set([d.year for d in list(data_dict.keys()) if d.month == month])
-    if len(data_dict) == 0:
+    unique_years = np.unique(years[in_month])
+    if len(unique_years) == 0:
         if year:
             raise ValueError(f"No days in month '{month}'-'{year}' in input 'dates'.")
         else:
@@ -131,28 +319,480 @@ def preprocess_month(
             f"Month '{month}' is not uniquely defined. Please specify 'year'."
         )
 
-    # Get the year in question.
-    year = list(data_dict.keys())[0].year
-    # Get last day of month.
-    last_day = calendar.monthrange(year, month)[1]
-
-    # Fill in date range if range is not complete.
-    if len(data_dict) != last_day:
-        first_date = datetime.date(year, month, 1)
-        last_date = datetime.date(year, month, last_day)
-        dates_out = date_range(first_date, last_date)
-        # Fill in zero for added dates.
-        data_out = [data_dict.get(date, 0) for date in dates_out]
-    else:
-        dates_out = list(data_dict.keys())
-        data_out = list(data_dict.values())
+    return complete_months(dates_clean[in_month], data_clean[in_month])
 
+
+def complete_months(
+    dates: np.ndarray, data: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Extend a sorted and contiguous date range to cover whole months.
+
+    Args:
+        dates: Sorted and contiguous datetime64[D] array.
+        data: Data array corresponding to `dates`.
+    Returns:
+        dates: All dates in the months spanned by input `dates`.
+        data: Masked data for those months, masked for the added dates.
+    """
+    first_date = dates[0].astype("datetime64[M]").astype("datetime64[D]")
+    last_date = (dates[-1].astype("datetime64[M]") + 1).astype("datetime64[D]")
+    if dates[0] == first_date and dates[-1] == last_date - 1:
+        return dates, np.ma.asarray(data)
+
+    dates_out = np.arange(first_date, last_date)
+    data_out = _masked_zeros(len(dates_out), data.dtype)
+    offset = (dates[0] - first_date).astype(int)
+    data_out[offset : offset + len(data)] = data
     return dates_out, data_out
 
 
+def split_months(
+    dates: np.ndarray, data: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Split sorted dates and data into one (dates, data) pair per month.
+
+    Args:
+        dates: Sorted datetime64[D] array.
+        data: Data array corresponding to `dates`.
+    Returns:
+        List of (dates, data) tuples, one for each month in input `dates`.
+    """
+    months = dates.astype("datetime64[M]")
+    boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+    return list(zip(np.split(dates, boundaries), np.split(data, boundaries)))
+
+
+def _timestamp_converter(
+    timestamp: Union[str, datetime.date, datetime.datetime],
+) -> datetime.datetime:
+    """Convert input timestamp to a naive datetime.datetime in UTC if the input is
+    timezone aware, or else in the same (unknown) timezone as the input.
+    """
+    if isinstance(timestamp, str):
+        timestamp = dt.fromisoformat(timestamp)
+    if isinstance(timestamp, datetime.datetime):
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(datetime.timezone.utc)
+        return timestamp.replace(tzinfo=None)
+    elif isinstance(timestamp, datetime.date):
+        return dt(timestamp.year, timestamp.month, timestamp.day)
+    else:
+        raise TypeError(
+            "Expected 'timestamp' to be type: [str, datetime.date, "
+            f"datetime.datetime] or a number of seconds. Got: {type(timestamp)}."
+        )
+
+
+def to_timestamps(
+    timestamps: Union[Sequence[Any], np.ndarray], tz: Optional[Any] = None
+) -> np.ndarray:
+    """Convert input timestamps to a NumPy array of dtype datetime64[s].
+
+    Numbers are taken as seconds since 1970-01-01 UTC. Timezone aware datetimes and
+    ISO strings with an UTC offset are converted to UTC.
+
+    Args:
+        timestamps: List (/np.array/pd.Series) of timestamps.
+        tz: Timezone to get local times in, as an IANA name (e.g. 'Europe/Oslo') or
+            a datetime.tzinfo. If given, naive timestamps are taken to be in UTC.
+    Returns:
+        Array of timestamps with dtype datetime64[s].
+    """
+    arr = np.asarray(timestamps)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        times = arr.astype("datetime64[s]")
+    elif arr.dtype.kind in "iuf":
+        times = np.floor(arr).astype(np.int64).astype("datetime64[s]")
+    else:
+        try:
+            with warnings.catch_warnings():
+                # Parsing of strings with UTC offsets is deprecated in NumPy.
+                warnings.simplefilter("error", DeprecationWarning)
+                if arr.dtype.kind not in "USO":
+                    raise TypeError
+                times = arr.astype("datetime64[s]")
+        except (ValueError, TypeError, DeprecationWarning):
+            times = np.array(
+                [_timestamp_converter(ts) for ts in timestamps], dtype="datetime64[s]"
+            )
+
+    if tz is None or len(times) == 0:
+        return times
+
+    if isinstance(tz, str):
+        from zoneinfo import ZoneInfo
+
+        tz = ZoneInfo(tz)
+
+    def utc_offsets(utc_times: np.ndarray) -> np.ndarray:
+        return np.array(
+            [
+                utc.replace(tzinfo=datetime.timezone.utc).astimezone(tz).utcoffset()
+                for utc in utc_times.astype("datetime64[s]").tolist()
+            ],
+            dtype="timedelta64[s]",
+        )
+
+    # Look up UTC offsets at midnight UTC of every day in the range, and for each
+    # timestamp only on the days where the offset changes.
+    days = times.astype("datetime64[D]")
+    first_day = days.min()
+    day_idx = (days - first_day).astype(np.int64)
+    day_offsets = utc_offsets(first_day + np.arange(day_idx.max() + 2))
+    local_times = times + day_offsets[day_idx]
+    changes = np.flatnonzero(day_offsets[1:] != day_offsets[:-1])
+    if len(changes):
+        on_change_days = np.flatnonzero(np.isin(day_idx, changes))
+        local_times[on_change_days] = times[on_change_days] + utc_offsets(
+            times[on_change_days]
+        )
+    return local_times
+
+
+def check_agg(agg: str) -> None:
+    """Raise a ValueError if `agg` is not a valid aggregation."""
+    if agg not in ["count", "sum", "mean", "max", "min"]:
+        raise ValueError(
+            "Argument 'agg' must be one of 'count', 'sum', 'mean', 'max' or 'min'. "
+            f"Got: {agg}."
+        )
+
+
+def reduce_bins(
+    bins: np.ndarray,
+    n_bins: int,
+    weights: Optional[np.ndarray] = None,
+    agg: str = "count",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate weights by bin index.
+
+    Args:
+        bins: Integer array with the bin index (0 to n_bins - 1) of each element.
+        n_bins: Number of bins.
+        weights: Value of each element. Required unless `agg` is 'count'.
+        agg: Aggregation: 'count', 'sum', 'mean', 'max' or 'min'.
+    Returns:
+        values: Aggregated value of each bin. Empty bins are zero for 'count' and
+            'sum', and NaN otherwise.
+        counts: Number of elements in each bin.
+
+    Raises:
+        ValueError: If `agg` is not valid, or `weights` is missing.
+    """
+    check_agg(agg)
+    counts = np.bincount(bins, minlength=n_bins)
+    if agg == "count":
+        return counts, counts
+    if weights is None:
+        raise ValueError(f"Argument 'weights' is required when 'agg' is '{agg}'.")
+
+    weights = np.asarray(weights, dtype=float)
+    values: np.ndarray
+    if agg in ["sum", "mean"]:
+        values = np.bincount(bins, weights=weights, minlength=n_bins)
+        if agg == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = values / counts
+    else:
+        ufunc = np.maximum if agg == "max" else np.minimum
+        values = np.full(n_bins, -np.inf if agg == "max" else np.inf)
+        ufunc.at(values, bins, weights)
+        values[counts == 0] = np.nan
+
+    return values, counts
+
+
+def aggregate_events(
+    timestamps: Union[Sequence[Any], np.ndarray],
+    weights: Optional[Union[Sequence[float], np.ndarray]] = None,
+    agg: str = "count",
+    tz: Optional[Any] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate raw event timestamps into one value per day.
+
+    Args:
+        timestamps: List (/np.array/pd.Series) of event timestamps.
+        weights: Value of each event. Required unless `agg` is 'count'.
+        agg: Aggregation: 'count', 'sum', 'mean', 'max' or 'min'.
+        tz: Timezone that defines the days. See `to_timestamps`.
+    Returns:
+        dates: Sorted datetime64[D] array of the days with at least one event.
+        data: Aggregated value of each day in `dates`.
+    """
+    days = to_timestamps(timestamps, tz=tz).astype("datetime64[D]").astype(np.int64)
+    first_day = days.min()
+    values, counts = reduce_bins(
+        days - first_day,
+        days.max() - first_day + 1,
+        weights=None if weights is None else np.asarray(weights),
+        agg=agg,
+    )
+    has_events = np.flatnonzero(counts)
+    dates = (first_day + has_events).astype("datetime64[D]")
+    return dates, values[has_events]
+
+
+@instrument
+def hour_grid(
+    timestamps: Union[Sequence[Any], np.ndarray],
+    weights: Optional[Union[Sequence[float], np.ndarray]] = None,
+    agg: str = "count",
+    by: str = "day",
+    tz: Optional[Any] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Aggregate raw event timestamps into one value per hour of day and day.
+
+    Args:
+        timestamps: List (/np.array/pd.Series) of event timestamps.
+        weights: Value of each event. Required unless `agg` is 'count'.
+        agg: Aggregation: 'count', 'sum', 'mean', 'max' or 'min'.
+        by: 'day' for one row per day from the first to the last event, or
+            'weekday' for one row per weekday, Monday first.
+        tz: Timezone that defines the hours and days. See `to_timestamps`.
+    Returns:
+        grid: Array of shape (n_days, 24) if `by` is 'day', (7, 24) if 'weekday'.
+        dates: Contiguous datetime64[D] array with the day of each row if `by` is
+            'day', else None.
+    """
+    if by not in ["day", "weekday"]:
+        raise ValueError(f"Argument 'by' must be 'day' or 'weekday'. Got: {by}.")
+
+    times = to_timestamps(timestamps, tz=tz)
+    days = times.astype("datetime64[D]").astype(np.int64)
+    hours = times.astype("datetime64[h]").astype(np.int64) - days * 24
+    weights = None if weights is None else np.asarray(weights)
+
+    if by == "weekday":
+        # 1970-01-01 was a Thursday, see `grid_coords`.
+        values, _ = reduce_bins((days + 3) % 7 * 24 + hours, 7 * 24, weights, agg)
+        return values.reshape(7, 24), None
+
+    first_day = days.min()
+    n_days = days.max() - first_day + 1
+    values, _ = reduce_bins((days - first_day) * 24 + hours, n_days * 24, weights, agg)
+    dates = (first_day + np.arange(n_days)).astype("datetime64[D]")
+    return values.reshape(n_days, 24), dates
+
+
 def unique(arr: Union[np.ndarray, list]):
     """Order preserving alternative to np.unique()."""
     if isinstance(arr, np.ndarray):
         arr = arr.flatten()
 
     return list({i: None for i in arr}.keys())
+
+
+def grid_coords(
+    dates: Union[List[datetime.date], np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    # Days since 1970-01-01, which was a Thursday. Shifting by three days makes
+    # every ISO week (Monday to Sunday) a single integer week number.
+    ordinals = to_datetime64(dates).astype(np.int64) + 3
+    weeks, day_coords = np.divmod(ordinals, 7)
+
+    if not len(ordinals):
+        return weeks, day_coords, 0
+    # Contiguous dates occupy every week between the first and the last one.
+    if len(ordinals) < 2 or np.all(np.diff(ordinals) == 1):
+        week_coords = weeks - weeks[0]
+        n_weeks = week_coords[-1] + 1
+    else:
+        unique_weeks, week_coords = np.unique(weeks, return_inverse=True)
+        n_weeks = len(unique_weeks)
+    return week_coords, day_coords, int(n_weeks)
+
+
+def quantize(
+    values: Union[List[float], np.ndarray], vmin: float, vmax: float
+) -> np.ndarray:
+    """Quantize values into colormap bins, for a compact uint8 grid.
+
+    The bins split [vmin, vmax] evenly, and values outside are clipped to the first
+    or last bin, like the colors of a colormap. Pass the result to `date_grid` with
+    dtype 'uint8', and `vmin` and `vmax` as `cmin` and `cmax` to the renderers.
+
+    Args:
+        values: Array of values. NaN and masked values are missing.
+        vmin: Value at the start of the first bin.
+        vmax: Value at the end of the last bin.
+    Returns:
+        uint8 array of bin indices, QUANTIZED_MISSING where values are missing.
+    """
+    if isinstance(values, np.ma.MaskedArray):
+        values = fill_masked(values, None)
+    values = np.asarray(values, dtype=float)
+    index = np.full(values.shape, QUANTIZED_MISSING, dtype=np.uint8)
+    finite = np.isfinite(values)
+    if vmax > vmin:
+        scaled = (values[finite] - vmin) / (vmax - vmin) * QUANTIZED_LEVELS
+    else:
+        scaled = np.zeros(np.count_nonzero(finite))
+    index[finite] = np.clip(np.floor(scaled), 0, QUANTIZED_LEVELS - 1)
+    return index
+
+
+def color_limits(
+    cal: np.ndarray, cmin: Optional[float], cmax: Optional[float]
+) -> Tuple[float, float]:
+    """Get the color limits of a grid: `cmin` and `cmax`, or else its value range.
+
+    Raises:
+        ValueError: If the grid is quantized and `cmin` or `cmax` is missing.
+    """
+    if cal.dtype == np.uint8:
+        if cmin is None or cmax is None:
+            raise ValueError(
+                "Quantized grids need 'cmin' and 'cmax', the range they were "
+                f"quantized with. Got: 'cmin'={cmin} and 'cmax'={cmax}."
+            )
+        return cmin, cmax
+    return cmin or np.nanmin(cal), cmax or np.nanmax(cal)
+
+
+def check_cell_labels(value_label: bool, date_label: bool) -> None:
+    """Raise a ValueError if both value and date labels are asked for."""
+    if value_label and date_label:
+        raise ValueError(
+            "Maximum one of 'value_label' and 'date_label' can be "
+            f"set as 'True'. Got: 'value_label'={value_label} and"
+            f"'date_label'={date_label}."
+        )
+
+
+def _grid_fill(dtype: np.dtype) -> Any:
+    # Value of the cells without a date.
+    if dtype == np.uint8:
+        return QUANTIZED_MISSING
+    if dtype.kind in "fc":
+        return np.nan
+    return None if dtype.kind == "O" else 0
+
+
+@instrument
+def date_grid(
+    dates: Union[List[datetime.date], np.ndarray],
+    data: Union[List[Any], np.ndarray],
+    horizontal: bool,
+    dtype: str = "float64",
+) -> np.ndarray:
+    """Lay out one value per date in a grid of weeks and weekdays.
+
+    Args:
+        dates: Sorted array (/list) of dates.
+        data: Value of each date, or 2-D array with one row of values per grid.
+        horizontal: Grid shape (7, n_weeks) if True, (n_weeks, 7) if False.
+        dtype: dtype of the grid. Cells without a date are NaN in float grids
+            (e.g. 'float64' or the more compact 'float32'), None in object grids,
+            and QUANTIZED_MISSING in 'uint8' grids of values from `quantize`.
+    Returns:
+        Grid, or one grid per row of 2-D `data`.
+    """
+    week_coords, day_coords, n_weeks = grid_coords(dates)
+    n_days = 7
+    fill = _grid_fill(np.dtype(dtype))
+    # Missing (masked) values are drawn as empty cells, like the days outside
+    # the date range.
+    if isinstance(data, np.ma.MaskedArray):
+        data = fill_masked(data, fill if np.dtype(dtype) == np.uint8 else None)
+
+    # Create grid and fill with data. 2-D data gives one grid per row.
+    grid = np.full(np.shape(data)[:-1] + (n_weeks, n_days), fill, dtype=dtype)
+    grid[..., week_coords, day_coords] = data
+
+    if horizontal:
+        return np.swapaxes(grid, -1, -2)
+
+    return grid
+
+
+def period_locs(
+    dates: Union[List[datetime.date], np.ndarray], unit: str, daily: bool = False
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Locate each period (e.g. month 'M' or year 'Y') along the long axis.
+
+    Returns the periods as integers since 1970 in `unit`, the centre of each period
+    in week coordinates, and the number of weeks in the grid. If `daily`, the long
+    axis has one column per date (as from `hour_grid`) instead of one per week.
+    """
+    dates = to_datetime64(dates)
+    periods = dates.astype(f"datetime64[{unit}]").astype(np.int64)
+    if daily:
+        week_coords, n_weeks = np.arange(len(dates)), len(dates)
+    else:
+        week_coords, _, n_weeks = grid_coords(dates)
+
+    steps = np.diff(periods)
+    if np.all(steps >= 0):
+        # Sorted dates: each period is a run, with its first and last week at the
+        # ends of the run.
+        starts = np.append(0, np.flatnonzero(steps) + 1)
+        ends = np.append(starts[1:], len(periods)) - 1
+        locs = (week_coords[starts] + week_coords[ends] + 1) / 2
+        return periods[starts], locs, n_weeks
+
+    bins = periods - periods.min()
+    first = np.full(bins.max() + 1, n_weeks)
+    last = np.full(bins.max() + 1, -1)
+    np.minimum.at(first, bins, week_coords)
+    np.maximum.at(last, bins, week_coords)
+    present = last >= 0
+    locs = (first[present] + last[present] + 1) / 2
+    return np.flatnonzero(present) + periods.min(), locs, n_weeks
+
+
+def format_cells(cal: np.ndarray, fmt: str) -> np.ndarray:
+    """Format finite grid values with a printf style format. Others become ''."""
+    finite = np.isfinite(cal)
+    labels = np.full(cal.shape, "", dtype=object)
+    labels[finite] = np.char.mod(fmt, cal[finite])
+    return labels.astype(str)
+
+
+def value_label_format(value_format: str) -> str:
+    if value_format == "int":
+        return "%0.0f"
+    elif value_format == "decimal":
+        return "%0.1f"
+    else:
+        raise ValueError(
+            "Argument 'value_format' must be equal to either "
+            f"'int' or 'float'. Got: {value_format}."
+        )
+
+
+def _edge_runs(edges: np.ndarray) -> np.ndarray:
+    """Find runs of consecutive True values along each row of a boolean array.
+
+    Returns:
+        Array with columns (row, start, end) of each run, end exclusive.
+    """
+    padded = np.zeros((edges.shape[0], edges.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = edges
+    steps = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+    return np.column_stack([rows, starts, ends])
+
+
+@instrument
+def get_month_outline(
+    dates: Union[List[datetime.date], np.ndarray], horizontal: bool
+) -> np.ndarray:
+    # Grid of months since epoch, with -1 for cells without a date. The grid is
+    # padded with empty cells, so outer edges are found like any other edge.
+    month_ids = to_datetime64(dates).astype("datetime64[M]").astype(np.int64)
+    id_grid = date_grid(dates, month_ids, horizontal=False)
+    id_grid = np.pad(np.nan_to_num(id_grid, nan=-1), 1, constant_values=-1)
+
+    # Cell (week, weekday) spans x in [weekday, weekday + 1], y in [week, week + 1].
+    # Horizontal edge at y = i between cells (i - 1, j) and (i, j) of other months.
+    h_runs = _edge_runs(id_grid[:-1, 1:-1] != id_grid[1:, 1:-1])
+    # Vertical edge at x = j between cells (i, j - 1) and (i, j) of other months.
+    v_runs = _edge_runs((id_grid[1:-1, :-1] != id_grid[1:-1, 1:]).T)
+
+    # Segments ((start, y), (end, y)) and ((x, start), (x, end)).
+    h_segments = np.stack([h_runs[:, [1, 0]], h_runs[:, [2, 0]]], axis=1)
+    v_segments = np.stack([v_runs[:, [0, 1]], v_runs[:, [0, 2]]], axis=1)
+    segments = np.concatenate([h_segments, v_segments]).astype(float)
+
+    return segments[..., ::-1] if horizontal else segments